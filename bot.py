@@ -6,6 +6,7 @@ from dotenv import load_dotenv
 from discord.ext import commands, tasks
 from discord.ui import Select
 import services.mongo as mongo
+import services.audit_writer as audit_writer
 from typing import Optional
 
 
@@ -33,6 +34,11 @@ class GrailBot(commands.Bot):
         # setup mongodb database
         self.db = mongo.get_database('grail-kun')
         self.db_fan_servants = mongo.get_database('fan-servants')
+        # Native asyncio handles for code running on the event loop; the sync
+        # handles above are for work that already runs in threads. Each kind
+        # shares one pooled client across databases (see services/mongo.py).
+        self.adb = mongo.get_async_database('grail-kun')
+        self.adb_fan_servants = mongo.get_async_database('fan-servants')
         self.sessions: Optional[aiohttp.ClientSession] = None
 
 
@@ -75,6 +81,10 @@ class GrailBot(commands.Bot):
         if self.session:
             await self.session.close()
         await super().close()
+        # Cogs are unloaded by now, so no more audit events will be queued.
+        await asyncio.to_thread(audit_writer.close_default_audit_writer)
+        await mongo.close_async_clients()
+        await asyncio.to_thread(mongo.close_clients)
 
 
     @tasks.loop(minutes=10)
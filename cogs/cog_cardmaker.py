@@ -1,29 +1,44 @@
 from __future__ import annotations
 
 import asyncio
-from pathlib import Path
-from typing import Any
+import io
+import time
+from typing import Any, Awaitable, Callable
 
 import discord
 from discord import app_commands
 from discord.ext import commands
 
-from cogs_cardmaker.card import Defaults
+from cogs_cardmaker.faceclaim_gc import collect_garbage, format_bytes
+from cogs_cardmaker.render_api import start_render_api_from_env
+from cogs_cardmaker.render_cache import default_render_cache
+from cogs_cardmaker.render_scheduler import PRIORITY_INTERACTIVE, PRIORITY_SINGLE, default_render_scheduler
 from cogs_cardmaker.repo import CardmakerRepo, build_character_doc, utc_now
 from cogs_cardmaker.service import (
     STATUS_TAGS,
     create_template_text,
     design_supports_custom_background_async,
+    export_path,
+    faceclaim_hash_async,
+    faceclaim_path,
     image_filename,
     load_temporary_background_image_async,
     parse_create_template,
+    prerender_card_async,
     render_card_bytes_async,
+    render_many_async,
     save_faceclaim_bytes_async,
+    start_design_watcher,
     starter_body,
+    stop_design_watcher,
     strip_links,
     template_role_for,
     thread_title,
+    write_cards_zip,
 )
+from services.audit_writer import default_audit_writer
+from services.guild_config import default_guild_config_cache
+from services.mongo import pool_stats
 
 
 STATUS_DISPLAY = {"active": "Active", "hiatus": "Hiatus", "retired": "Retired"}
@@ -31,6 +46,10 @@ TYPE_TAGS = {"pc", "npc"}
 PLAYER_STATUS_TAGS = {"looking for rp", "looking for master", "looking for servant"}
 RESOURCE_EMBED_COLOR = 5814783
 TAG_AUDIT_LOOKBACK_SECONDS = 15
+# Minimum gap between posts in `post` and `postall`. Upcoming cards keep
+# rendering during it, so it only spaces out the Discord calls.
+POST_INTERVAL_SECONDS = 1.0
+POSTALL_PROGRESS_SECONDS = 10.0
 
 
 def is_admin_member(member: discord.abc.User) -> bool:
@@ -143,6 +162,7 @@ class CardEditModal(discord.ui.Modal):
             if not character:
                 await interaction.followup.send("I couldn't find this card anymore.", ephemeral=True)
                 return
+            await self.cog.prerender_card(character)
             await self.cog.refresh_thread_from_character(interaction.channel, character, actor_id=interaction.user.id)
             await interaction.followup.send("Card updated.", ephemeral=True)
         except Exception as exc:
@@ -400,15 +420,82 @@ class DeleteCardConfirmView(discord.ui.View):
         await interaction.response.edit_message(content="Delete cancelled.", view=None)
 
 
+class PostPacer:
+    """Keeps batch posts at least `interval` seconds apart, counting time already spent."""
+
+    def __init__(self, interval: float = POST_INTERVAL_SECONDS):
+        self.interval = interval
+        self._next_at = 0.0
+
+    async def wait(self) -> None:
+        delay = self._next_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def posted(self) -> None:
+        self._next_at = time.monotonic() + self.interval
+
+
+class PostallProgress:
+    """The postall status message, edited at most every `interval` seconds."""
+
+    def __init__(self, run: dict[str, Any], interval: float = POSTALL_PROGRESS_SECONDS):
+        self.message: discord.Message | None = None
+        self.total = run["total"]
+        self.posted = run["posted"]
+        self.failures = [entry["error"] or f"`{entry['character_id']}` was not posted" for entry in run["failed"]]
+        self.interval = interval
+        self._edited_at = time.monotonic()
+
+    def record(self, posted: bool, error: str | None) -> None:
+        if posted:
+            self.posted += 1
+        else:
+            self.failures.append(error or "not posted")
+
+    def text(self, current: str | None = None, *, done: bool = False) -> str:
+        handled = self.posted + len(self.failures)
+        head = "Postall complete." if done else "Posting unposted active characters."
+        text = f"{head} {handled}/{self.total} handled: {self.posted} posted, {len(self.failures)} not posted."
+        return f"{text}\nNow posting `{current}`." if current and not done else text
+
+    async def start(self, ctx: commands.Context) -> None:
+        self.message = await ctx.send(self.text())
+        self._edited_at = time.monotonic()
+
+    async def update(self, current: str | None = None, *, done: bool = False) -> None:
+        if self.message is None or not done and time.monotonic() - self._edited_at < self.interval:
+            return
+        self._edited_at = time.monotonic()
+        try:
+            await self.message.edit(content=self.text(current, done=done))
+        except discord.HTTPException as exc:
+            # Progress is cosmetic; the run and its checkpoint carry on.
+            print(f"Postall progress update failed: {exc}")
+
+
 class CardmakerCog(commands.Cog):
     card_app = app_commands.Group(name="card", description="Character card tools")
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.repo = CardmakerRepo(bot.db)
+        self.repo = CardmakerRepo(bot.adb, bot.db)
         self.pending_faceclaim_uploads: dict[tuple[int, int], str] = {}
         self.pending_background_uploads: dict[tuple[int, int], str] = {}
         self.pending_bot_tag_edits: set[int] = set()
+        self.postall_guilds: set[int] = set()
+        self.render_api = None
+
+    async def cog_load(self):
+        start_design_watcher()
+        self.render_api = await start_render_api_from_env()
+
+    async def cog_unload(self):
+        stop_design_watcher()
+        if self.render_api:
+            await self.render_api.cleanup()
+            self.render_api = None
+        await asyncio.to_thread(default_render_cache().flush)
 
     async def delete_message_quietly(self, message: discord.Message):
         try:
@@ -623,22 +710,37 @@ class CardmakerCog(commands.Cog):
         add_tag_name(type_name)
         return tags
 
-    async def make_card_file(self, character: dict[str, Any], runtime_images: dict[str, Any] | None = None) -> discord.File:
-        data = await render_card_bytes_async(character, runtime_images=runtime_images)
+    async def make_card_file(
+        self,
+        character: dict[str, Any],
+        runtime_images: dict[str, Any] | None = None,
+        data: io.BytesIO | None = None,
+        priority: str = PRIORITY_SINGLE,
+    ) -> discord.File:
+        if data is None:
+            data = await render_card_bytes_async(character, runtime_images=runtime_images, priority=priority)
         return discord.File(data, filename=image_filename(character))
 
+    async def prerender_card(self, character: dict[str, Any]) -> None:
+        # Starts the render while the thread edits and message fetches are still
+        # going; the refresh that follows joins it instead of rendering again.
+        try:
+            await prerender_card_async(character)
+        except Exception as exc:
+            # Speculative only; the real render reports the same problem.
+            print(f"Card pre-render skipped for {character.get('_id')}: {exc}")
+
     def make_faceclaim_file(self, character: dict[str, Any]) -> discord.File | None:
-        avatar_path = str(character.get("avatar_path") or "").strip()
-        if not avatar_path:
-            return None
-        path = Path(avatar_path)
-        if not path.is_absolute():
-            path = Defaults.FACECLAIMS_DIR / path
-        if not path.exists() or not path.is_file():
+        path = faceclaim_path(character)
+        if not path:
             return None
         return discord.File(str(path), filename=path.name)
 
-    def make_resource_embed(self, character: dict[str, Any], attachment_filename: str | None = None) -> discord.Embed:
+    def make_resource_embed(
+        self,
+        character: dict[str, Any],
+        attachment_filename: str | None = None,
+    ) -> discord.Embed:
         embed = discord.Embed(color=RESOURCE_EMBED_COLOR)
         embed.add_field(
             name="Character Sheet",
@@ -649,14 +751,31 @@ class CardmakerCog(commands.Cog):
             embed.set_thumbnail(url=f"attachment://{attachment_filename}")
         return embed
 
-    def resource_post_id_for_thread(self, character: dict[str, Any], thread_id: int) -> str | None:
+    def resource_post_for_thread(self, character: dict[str, Any], thread_id: int) -> dict[str, Any] | None:
         discord_block = character.get("discord") or {}
         for post in discord_block.get("posts") or []:
             if str(post.get("thread_id")) == str(thread_id):
-                resource_id = post.get("resource_message_id")
-                return str(resource_id) if resource_id else None
+                return post
+        return None
+
+    def resource_post_id_for_thread(self, character: dict[str, Any], thread_id: int) -> str | None:
+        post = self.resource_post_for_thread(character, thread_id) or {}
+        resource_id = post.get("resource_message_id")
+        return str(resource_id) if resource_id else None
+
+    def resource_attachment(self, message: discord.Message, filename: str | None) -> discord.Attachment | None:
+        for attachment in message.attachments:
+            if filename and attachment.filename == filename:
+                return attachment
         return None
 
+    def resource_faceclaim_doc(self, message: discord.Message, filename: str | None, digest: str | None) -> dict[str, Any] | None:
+        # Only what change detection needs. Attachment URLs are signed and expire,
+        # so the embed refers to the attachment by filename instead.
+        if not digest or not self.resource_attachment(message, filename):
+            return None
+        return {"hash": digest, "filename": filename}
+
     async def fetch_resource_message(self, thread: discord.Thread, character: dict[str, Any]) -> discord.Message | None:
         resource_id = self.resource_post_id_for_thread(character, thread.id)
         if not resource_id:
@@ -667,7 +786,9 @@ class CardmakerCog(commands.Cog):
             pass
         return None
 
-    async def send_resource_message(self, thread: discord.Thread, character: dict[str, Any]) -> discord.Message:
+    async def send_resource_message(self, thread: discord.Thread, character: dict[str, Any]) -> tuple[discord.Message, dict[str, Any] | None]:
+        path = faceclaim_path(character)
+        digest = await faceclaim_hash_async(path) if path else None
         faceclaim_file = self.make_faceclaim_file(character)
         embed = self.make_resource_embed(character, faceclaim_file.filename if faceclaim_file else None)
         kwargs: dict[str, Any] = {
@@ -676,31 +797,48 @@ class CardmakerCog(commands.Cog):
         }
         if faceclaim_file:
             kwargs["file"] = faceclaim_file
-        return await thread.send(**kwargs)
+        msg = await thread.send(**kwargs)
+        return msg, self.resource_faceclaim_doc(msg, faceclaim_file.filename if faceclaim_file else None, digest)
 
     async def refresh_resource_message(self, thread: discord.Thread, character: dict[str, Any], actor_id: int | str | None) -> None:
-        faceclaim_file = self.make_faceclaim_file(character)
-        embed = self.make_resource_embed(character, faceclaim_file.filename if faceclaim_file else None)
+        path = faceclaim_path(character)
+        digest = await faceclaim_hash_async(path) if path else None
         msg = await self.fetch_resource_message(thread, character)
-        if msg:
-            await msg.edit(embed=embed, attachments=[faceclaim_file] if faceclaim_file else [])
+        if not msg:
+            msg, uploaded = await self.send_resource_message(thread, character)
+            await self.repo.set_resource_message_id(
+                character["_id"],
+                thread_id=thread.id,
+                resource_message_id=msg.id,
+                actor_id=actor_id,
+                resource_faceclaim=uploaded,
+            )
+            return
+
+        # The faceclaim is unchanged since the last upload, so keep the attachment
+        # already on the message instead of uploading it again.
+        stored = (self.resource_post_for_thread(character, thread.id) or {}).get("resource_faceclaim") or {}
+        cached = {"hash": stored["hash"], "filename": stored.get("filename")} if stored.get("hash") else None
+        existing = self.resource_attachment(msg, cached["filename"]) if cached and cached["hash"] == digest else None
+        if existing:
+            await msg.edit(embed=self.make_resource_embed(character, existing.filename), attachments=[existing])
             return
-        kwargs: dict[str, Any] = {
-            "embed": embed,
-            "allowed_mentions": discord.AllowedMentions.none(),
-        }
-        if faceclaim_file:
-            kwargs["file"] = faceclaim_file
-        msg = await thread.send(**kwargs)
-        await self.repo.set_resource_message_id(
-            character["_id"],
-            thread_id=thread.id,
-            resource_message_id=msg.id,
-            actor_id=actor_id,
-        )
 
-    async def create_card_thread(self, forum: discord.ForumChannel, character: dict[str, Any], actor_id: int | str) -> discord.Thread:
-        card_file = await self.make_card_file(character)
+        faceclaim_file = self.make_faceclaim_file(character)
+        embed = self.make_resource_embed(character, faceclaim_file.filename if faceclaim_file else None)
+        msg = await msg.edit(embed=embed, attachments=[faceclaim_file] if faceclaim_file else [])
+        uploaded = self.resource_faceclaim_doc(msg, faceclaim_file.filename if faceclaim_file else None, digest)
+        if uploaded != cached:
+            await self.repo.set_resource_faceclaim(character["_id"], thread_id=thread.id, resource_faceclaim=uploaded)
+
+    async def create_card_thread(
+        self,
+        forum: discord.ForumChannel,
+        character: dict[str, Any],
+        actor_id: int | str,
+        card_data: io.BytesIO | None = None,
+    ) -> discord.Thread:
+        card_file = await self.make_card_file(character, data=card_data)
         result = await forum.create_thread(
             name=thread_title(character),
             content=starter_body(character),
@@ -711,7 +849,7 @@ class CardmakerCog(commands.Cog):
         )
         thread = getattr(result, "thread", result)
         message = getattr(result, "message", None)
-        resource_message = await self.send_resource_message(thread, character)
+        resource_message, resource_faceclaim = await self.send_resource_message(thread, character)
         await self.repo.mark_posted(
             character["_id"],
             guild_id=forum.guild.id,
@@ -720,6 +858,7 @@ class CardmakerCog(commands.Cog):
             starter_message_id=getattr(message, "id", None),
             resource_message_id=resource_message.id,
             actor_id=actor_id,
+            resource_faceclaim=resource_faceclaim,
         )
         return thread
 
@@ -744,6 +883,7 @@ class CardmakerCog(commands.Cog):
         character: dict[str, Any],
         actor_id: int | str | None,
         runtime_images: dict[str, Any] | None = None,
+        priority: str = PRIORITY_INTERACTIVE,
     ):
         if not isinstance(channel, discord.Thread):
             raise RuntimeError("Card updates must run inside a card thread.")
@@ -773,7 +913,7 @@ class CardmakerCog(commands.Cog):
 
         msg = await self.fetch_starter_message(channel, character)
         if msg:
-            card_file = await self.make_card_file(character, runtime_images=runtime_images)
+            card_file = await self.make_card_file(character, runtime_images=runtime_images, priority=priority)
             await msg.edit(
                 content=starter_body(character),
                 attachments=[card_file],
@@ -859,6 +999,8 @@ class CardmakerCog(commands.Cog):
             actor_id,
             "status_synced_from_tags",
         )
+        if updated:
+            await self.prerender_card(updated)
         if updated and allow_type_sync and found_type:
             await self.refresh_thread_from_character(thread, updated, actor_id=actor_id)
         return updated or character, desired_tags
@@ -932,6 +1074,7 @@ class CardmakerCog(commands.Cog):
                     "faceclaim_replaced",
                 )
                 if character:
+                    await self.prerender_card(character)
                     await self.refresh_thread_from_character(message.channel, character, actor_id=message.author.id)
             else:
                 if not await design_supports_custom_background_async(character):
@@ -1006,9 +1149,17 @@ class CardmakerCog(commands.Cog):
         except Exception as exc:
             await ctx.send(f"Create failed: `{exc}`")
 
-    async def post_character(self, ctx: commands.Context, character: dict[str, Any]) -> bool:
+    async def post_character(
+        self,
+        ctx: commands.Context,
+        character: dict[str, Any],
+        card_data: io.BytesIO | None = None,
+        *,
+        notify: Callable[[str], Awaitable[Any]] | None = None,
+    ) -> bool:
+        notify = notify or ctx.send
         if not ctx.guild:
-            await ctx.send("This only works in a server.")
+            await notify("This only works in a server.")
             return False
         thread_id = self.posted_thread_for_guild(character, ctx.guild.id)
         if thread_id:
@@ -1023,12 +1174,12 @@ class CardmakerCog(commands.Cog):
                     "post_existing_thread_verify_failed",
                     {"thread_id": thread_id, "error": str(exc)},
                 )
-                await ctx.send(f"`{character.get('name')}` has a stored thread, but I couldn't verify it: `{exc}`")
+                await notify(f"`{character.get('name')}` has a stored thread, but I couldn't verify it: `{exc}`")
                 return False
 
             if exists:
                 await self.repo.add_audit(character["_id"], ctx.author.id, "post_existing_thread_linked", {"thread_id": thread_id})
-                await ctx.send(f"`{character.get('name')}` is already posted: <#{thread_id}>")
+                await notify(f"`{character.get('name')}` is already posted: <#{thread_id}>")
                 return False
 
             updated = await self.repo.remove_post_for_guild(
@@ -1039,18 +1190,18 @@ class CardmakerCog(commands.Cog):
             )
             if updated:
                 character = updated
-            await ctx.send(f"`{character.get('name')}` had a stale deleted thread reference. Reposting now.")
+            await notify(f"`{character.get('name')}` had a stale deleted thread reference. Reposting now.")
         forum = await self.configured_forum(ctx.guild, str(character.get("scope") or "full").lower())
         if not forum:
-            await ctx.send("Card forum is not configured for this character scope yet.")
+            await notify(f"Card forum is not configured for `{character.get('name')}`'s scope yet.")
             return False
         try:
-            thread = await self.create_card_thread(forum, character, ctx.author.id)
-            await ctx.send(f"Posted `{character.get('name')}`: {thread.mention}")
+            thread = await self.create_card_thread(forum, character, ctx.author.id, card_data=card_data)
+            await notify(f"Posted `{character.get('name')}`: {thread.mention}")
             return True
         except Exception as exc:
             await self.repo.set_last_error(character["_id"], str(exc), ctx.author.id)
-            await ctx.send(f"Post failed for `{character.get('name')}`: `{exc}`")
+            await notify(f"Post failed for `{character.get('name')}`: `{exc}`")
             return False
 
     @card_group.command(name="post")
@@ -1060,7 +1211,7 @@ class CardmakerCog(commands.Cog):
             await ctx.send("Provide one or more character IDs, doc IDs, or doc URLs.")
             return
 
-        successes = 0
+        characters: list[dict[str, Any]] = []
         failures: list[str] = []
         for ref in refs:
             character, matches = await self.repo.find_one_by_reference(ref)
@@ -1071,9 +1222,21 @@ class CardmakerCog(commands.Cog):
                 else:
                     failures.append(f"{ref}: not found")
                 continue
-            if await self.post_character(ctx, character):
+            characters.append(character)
+
+        successes = 0
+        pacer = PostPacer()
+        # Later cards render on the worker pool while earlier ones are posted.
+        async for result in render_many_async(characters, priority=PRIORITY_SINGLE):
+            character = result.character
+            if result.error:
+                await self.repo.set_last_error(character["_id"], str(result.error), ctx.author.id)
+                await ctx.send(f"Post failed for `{character.get('name')}`: `{result.error}`")
+                continue
+            await pacer.wait()
+            if await self.post_character(ctx, character, card_data=result.data):
                 successes += 1
-            await asyncio.sleep(1)
+            pacer.posted()
         if len(refs) == 1 and failures:
             await ctx.send(f"Post failed: {failures[0]}")
         elif len(refs) > 1:
@@ -1081,20 +1244,130 @@ class CardmakerCog(commands.Cog):
             if failures:
                 await ctx.send("Failures:\n" + "\n".join(f"- {failure}" for failure in failures[:10]))
 
+    async def settle_interrupted_post(self, guild: discord.Guild, run: dict[str, Any]) -> None:
+        """
+        Settle the card an interrupted postall was posting. It counts as posted
+        if the post was saved. A thread the bot created for it without saving the
+        post is reported rather than posting the card a second time.
+        """
+        character = await self.repo.get_character(run["current"])
+        if not character:
+            await self.repo.update_postall_run(guild.id, current=None)
+            return
+        if self.posted_thread_for_guild(character, guild.id):
+            await self.repo.record_postall_result(guild.id, character["_id"], posted=True)
+            return
+        forum = await self.configured_forum(guild, str(character.get("scope") or "full").lower())
+        title = thread_title(character)
+        orphan = next((t for t in forum.threads if t.name == title and t.owner_id == self.bot.user.id), None) if forum else None
+        if not orphan:
+            # Nothing reached Discord, so the card is simply posted again.
+            await self.repo.update_postall_run(guild.id, current=None)
+            return
+        await self.repo.record_postall_result(
+            guild.id,
+            character["_id"],
+            posted=False,
+            error=(
+                f"`{character.get('name')}` may already be posted in {orphan.mention}, which was created "
+                f"before postall stopped but not saved. Delete it, then use `f.card post {character['_id']}`."
+            ),
+        )
+
     @card_group.command(name="postall")
     @commands.check(cardmaker_staff_check)
-    async def postall(self, ctx: commands.Context):
-        characters = await self.repo.list_postable(ctx.guild.id)
-        if not characters:
+    async def postall(self, ctx: commands.Context, mode: str = "resume"):
+        mode = mode.lower()
+        if mode not in {"resume", "restart"}:
+            await ctx.send("Mode must be `resume` or `restart`.")
+            return
+        if ctx.guild.id in self.postall_guilds:
+            await ctx.send("A postall is already running in this server.")
+            return
+        self.postall_guilds.add(ctx.guild.id)
+        try:
+            await self.run_postall(ctx, restart=mode == "restart")
+        finally:
+            self.postall_guilds.discard(ctx.guild.id)
+
+    async def run_postall(self, ctx: commands.Context, *, restart: bool) -> None:
+        guild_id = ctx.guild.id
+        run = None if restart else await self.repo.get_postall_run(guild_id)
+        if run and run.get("current"):
+            await self.settle_interrupted_post(ctx.guild, run)
+            run = await self.repo.get_postall_run(guild_id)
+        skip_ids = [entry["character_id"] for entry in run["failed"]] if run else []
+        remaining = await self.repo.count_postable(guild_id, skip_ids)
+        if run:
+            run["total"] = run["posted"] + len(run["failed"]) + remaining
+            await self.repo.update_postall_run(guild_id, total=run["total"])
+            intro = f"Resuming an interrupted postall: {remaining} character(s) left. Use `f.card postall restart` to start over."
+        elif not remaining:
             await ctx.send("No unposted active characters found.")
             return
-        await ctx.send(f"Posting {len(characters)} unposted active character(s).")
-        posted = 0
-        for character in characters:
-            if await self.post_character(ctx, character):
-                posted += 1
-            await asyncio.sleep(1)
-        await ctx.send(f"Postall complete. Posted {posted} of {len(characters)} unposted candidate(s).")
+        else:
+            run = await self.repo.start_postall_run(guild_id, actor_id=ctx.author.id, total=remaining)
+            intro = f"Posting {remaining} unposted active character(s)."
+        await ctx.send(intro)
+
+        progress = PostallProgress(run)
+        await progress.start(ctx)
+        pacer = PostPacer()
+        notes: list[str] = []
+
+        async def note(text: str) -> None:
+            notes.append(text)
+
+        # Characters stream from a cursor and cards render ahead on the worker
+        # pool, while posting stays one at a time and in order. The checkpoint
+        # names the card being posted, then records how it went.
+        async for result in render_many_async(self.repo.iter_postable_sync(guild_id, skip_ids)):
+            character = result.character
+            await progress.update(character.get("name"))
+            if result.error:
+                await self.repo.set_last_error(character["_id"], str(result.error), ctx.author.id)
+                posted, error = False, f"Post failed for `{character.get('name')}`: `{result.error}`"
+            else:
+                await pacer.wait()
+                await self.repo.update_postall_run(guild_id, current=character["_id"])
+                notes.clear()
+                posted = await self.post_character(ctx, character, card_data=result.data, notify=note)
+                error = None if posted else (notes[-1] if notes else None)
+                pacer.posted()
+            await self.repo.record_postall_result(guild_id, character["_id"], posted=posted, error=error)
+            progress.record(posted, error)
+        await self.repo.finish_postall_run(guild_id)
+        await progress.update(done=True)
+
+        await ctx.send(f"Postall complete. Posted {progress.posted} of {progress.total} unposted candidate(s).")
+        if progress.failures:
+            lines = "\n".join(f"- {failure}" for failure in progress.failures[:10])
+            more = f"\n... {len(progress.failures) - 10} more" if len(progress.failures) > 10 else ""
+            await ctx.send(f"Not posted:\n{lines}{more}")
+
+    @card_group.command(name="export")
+    @commands.check(cardmaker_staff_check)
+    async def export(self, ctx: commands.Context, status: str = "active"):
+        status = status.lower()
+        if status != "all" and status not in STATUS_TAGS:
+            await ctx.send("Status must be `active`, `hiatus`, `retired`, or `all`.")
+            return
+        await ctx.send(f"Exporting {status} character cards.")
+        path = export_path(status)
+        # The cursor, renders and archive writes all stay off the event loop.
+        written, failures = await asyncio.to_thread(write_cards_zip, self.repo.iter_characters_sync(status), path)
+        summary = f"Export complete. Cards: {written}. Failures: {len(failures)}."
+        size = path.stat().st_size
+        if size <= ctx.guild.filesize_limit:
+            await ctx.send(summary, file=discord.File(path, filename=path.name))
+            path.unlink(missing_ok=True)
+        else:
+            await ctx.send(
+                f"{summary} The archive is {size / (1024 * 1024):.1f} MB, over this server's upload limit, "
+                f"so it was kept on the bot host at `{path}`."
+            )
+        if failures:
+            await ctx.send("Failures:\n" + "\n".join(f"- {failure}" for failure in failures[:10]))
 
     @card_group.command(name="edit", aliases=["panel"])
     async def edit(self, ctx: commands.Context):
@@ -1122,6 +1395,64 @@ class CardmakerCog(commands.Cog):
         await self.repo.set_default_design(ctx.guild.id, design)
         await ctx.send(f"Default card design set to `{design}`.")
 
+    @card_group.command(name="renderstats")
+    @commands.check(cardmaker_staff_check)
+    async def renderstats(self, ctx: commands.Context):
+        scheduler = default_render_scheduler().stats()
+        lines = [f"Render workers: {scheduler['workers']}"]
+        for priority, stats in scheduler["classes"].items():
+            lines.append(
+                f"- {priority}: {stats['queued']} queued, {stats['running']}/{stats['limit']} running, "
+                f"{stats['completed']} done, wait avg {stats['wait_avg_ms']:.0f} ms / max {stats['wait_max_ms']:.0f} ms"
+            )
+        cache = default_render_cache().stats()
+        lines.append(
+            f"Render cache: {cache['entries']} file(s), {cache['bytes'] / (1024 * 1024):.1f} MB, "
+            f"{cache['hit_rate']:.0%} hit rate"
+        )
+        characters = self.repo.cache.stats()
+        lines.append(
+            f"Character cache: {characters['documents']} card(s), {characters['threads']} thread(s), "
+            f"{characters['hit_rate']:.0%} hit rate ({characters['hits']} hits / {characters['misses']} misses)"
+        )
+        configs = default_guild_config_cache().stats()
+        lines.append(f"Guild config cache: {configs['guilds']} guild(s), {configs['hit_rate']:.0%} hit rate")
+        audit = default_audit_writer().stats()
+        lines.append(
+            f"Audit writer: {audit['queued']} queued, {audit['written']} written in {audit['batches']} batch(es), "
+            f"{audit['dropped']} dropped, {audit['failed']} failed, flush avg {audit['flush_avg_ms']:.0f} ms / max {audit['flush_max_ms']:.0f} ms"
+        )
+        for kind, pool in pool_stats().items():
+            lines.append(
+                f"MongoDB {kind} pool: {pool['in_use']} in use (peak {pool['peak_in_use']}), {pool['open']} open, "
+                f"checkout wait avg {pool['wait_avg_ms']:.1f} ms / p95 {pool['wait_p95_ms']:.1f} ms / max {pool['wait_max_ms']:.1f} ms, "
+                f"{pool['checkout_failures']} failed"
+            )
+        await ctx.send("\n".join(lines))
+
+    @card_group.command(name="gc")
+    @commands.check(cardmaker_staff_check)
+    async def faceclaim_gc(self, ctx: commands.Context, mode: str = "dry-run"):
+        mode = mode.lower()
+        if mode not in {"dry-run", "apply"}:
+            await ctx.send("Mode must be `dry-run` or `apply`.")
+            return
+        report = await asyncio.to_thread(collect_garbage, self.bot.db, apply=mode == "apply", actor_id=ctx.author.id)
+        lines = [
+            f"Faceclaim files scanned: {report.scanned}. Referenced: {report.referenced}. "
+            f"Skipped as too recent: {report.skipped_recent}.",
+            f"Unreferenced: {len(report.orphans)} file(s), {format_bytes(report.reclaimed_bytes)}.",
+        ]
+        if report.quarantine_dir:
+            lines.append(
+                f"Moved to `{report.quarantine_dir.name}` in faceclaims_quarantine/; reclaimed {format_bytes(report.reclaimed_bytes)}. "
+                f"Cached renders dropped: {report.renders_dropped}."
+            )
+        elif report.orphans:
+            lines.extend(f"- {name}" for name, _ in report.orphans[:10])
+            lines.append("Run `f.card gc apply` to quarantine them.")
+        await ctx.send("\n".join(lines))
+
     @card_group.command(name="setapprovedrole")
     @commands.has_permissions(manage_guild=True)
     async def setapprovedrole(self, ctx: commands.Context, *roles: discord.Role):
@@ -109,7 +109,7 @@ class FGOGacha(commands.Cog):
                                        '...' + author_id)
 
                 # update database
-                self.update_gacha_database(ctx.author.id, select.values[0], 10)
+                await self.update_gacha_database(ctx.author.id, select.values[0], 10)
                 # roll the gacha
                 await FGOGacha.sent_ten_roll_image(ctx, author_id, select.values[0])
                 COOLDOWN = True
@@ -146,7 +146,7 @@ class FGOGacha(commands.Cog):
                                        '...' + author_id)
 
                 # update database
-                self.update_gacha_database(ctx.author.id, select.values[0], 1)
+                await self.update_gacha_database(ctx.author.id, select.values[0], 1)
                 # roll the gacha
                 await FGOGacha.sent_single_roll_image(ctx, author_id, select.values[0])
                 COOLDOWN = True
@@ -176,7 +176,7 @@ class FGOGacha(commands.Cog):
         async def my_callback(interaction):
             global COOLDOWN
 
-            data = self.bot.db["fgogacha"].find_one(
+            data = await self.bot.adb["fgogacha"].find_one(
                 {"userID": ctx.author.id, "bannerID": select.values[0]})
             total_rolls = data["single"] + data["multi"] * 10
             await interaction.response.send_message(author_id + ' has made ' + str(total_rolls) + ' rolls on ' + BANNER_VALUES[select.values[0]])
@@ -189,28 +189,28 @@ class FGOGacha(commands.Cog):
         await ctx.send("Pick a banner", view=view)
 
 
-    def update_gacha_database(self, user_id, banner_id, roll_count=0):
-        user_details = self.bot.db["fgogacha"].find_one({"userID": user_id, "bannerID": banner_id})
+    async def update_gacha_database(self, user_id, banner_id, roll_count=0):
+        user_details = await self.bot.adb["fgogacha"].find_one({"userID": user_id, "bannerID": banner_id})
         if not user_details:
             # create new data
             if roll_count == 0:
                 pass
             elif roll_count == 1:
-                self.bot.db["fgogacha"].insert_one({"userID": user_id, "bannerID": banner_id, "single": 1, "multi": 0})
+                await self.bot.adb["fgogacha"].insert_one({"userID": user_id, "bannerID": banner_id, "single": 1, "multi": 0})
             else:
-                self.bot.db["fgogacha"].insert_one({"userID": user_id, "bannerID": banner_id, "single": 0, "multi": 1})
+                await self.bot.adb["fgogacha"].insert_one({"userID": user_id, "bannerID": banner_id, "single": 0, "multi": 1})
         else:
             # update existing data
             if roll_count == 0:
                 pass
             elif roll_count == 1:
                 single_count = user_details["single"] + 1
-                self.bot.db["fgogacha"].update_one({"userID": user_id, "bannerID": banner_id},
-                                                   {"$set": {"single": single_count}})
+                await self.bot.adb["fgogacha"].update_one({"userID": user_id, "bannerID": banner_id},
+                                                          {"$set": {"single": single_count}})
             else:
                 multi_count = user_details["multi"] + 1
-                self.bot.db["fgogacha"].update_one({"userID": user_id, "bannerID": banner_id},
-                                                   {"$set": {"multi": multi_count}})
+                await self.bot.adb["fgogacha"].update_one({"userID": user_id, "bannerID": banner_id},
+                                                          {"$set": {"multi": multi_count}})
 
     @staticmethod
     async def sent_ten_roll_image(message, author_id, banner_name):
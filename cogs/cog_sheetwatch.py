@@ -34,8 +34,8 @@ Responsibilities:
     - f.sheet audit <doc_url>
 
 Notes:
-- Uses bot.db (PyMongo) and bot.session (aiohttp) from your existing GrailBot.
-- All Mongo operations go through SheetRepo/GuildConfigRepo (which use asyncio.to_thread).
+- Uses bot.adb (AsyncMongoClient), bot.db (PyMongo, for the audit writer) and bot.session (aiohttp) from your existing GrailBot.
+- All Mongo operations go through SheetRepo/GuildConfigRepo (awaited natively, no worker threads).
 """
 
 from __future__ import annotations
@@ -105,8 +105,8 @@ class SheetWatchCog(commands.Cog):
         import asyncio
 
         self.bot = bot
-        self.cfg_repo = GuildConfigRepo(bot.db)     # PyMongo DB handle
-        self.repo = SheetRepo(bot.db)              # PyMongo DB handle
+        self.cfg_repo = GuildConfigRepo(bot.adb)    # AsyncMongoClient DB handle
+        self.repo = SheetRepo(bot.adb, bot.db)      # plus a PyMongo handle for the audit writer
         self.gdocs = GoogleDocsFetcher(bot.session)
         
         # for enqueuing new sheets that do not have an approved baseline yet
@@ -1043,14 +1043,7 @@ class SheetWatchCog(commands.Cog):
             await ctx.send("That doesn’t look like a Google Docs document URL.")
             return
 
-        # Direct sync cursor -> list() must be in a thread
-        import asyncio
-
-        def _fetch():
-            col = self.bot.db["sheet_audit"]
-            return list(col.find({"guild_id": str(ctx.guild.id), "doc_id": doc_id}).sort("at", -1).limit(10))
-
-        events = await asyncio.to_thread(_fetch)
+        events = await self.repo.recent_audit(ctx.guild.id, doc_id)
         if not events:
             await ctx.send("No audit events found.")
             return
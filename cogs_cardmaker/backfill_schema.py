@@ -7,14 +7,28 @@ from pathlib import Path
 from typing import Any
 
 from dotenv import load_dotenv
-from pymongo import MongoClient, ReplaceOne
+from pymongo import ReplaceOne
 
+from cogs_cardmaker.repo import SCHEMA_VERSION
 from cogs_cardmaker.service import generated_starter_body
+from services.mongo import get_client
 
 
 DEFAULT_DATABASE = "grail-kun"
 CHARACTER_COLLECTION = "cardmaker_characters"
 AUDIT_COLLECTION = "cardmaker_audit"
+DEFAULT_BATCH_SIZE = 500
+LEGACY_DISCORD_FIELDS = [
+    "guild_id",
+    "forum_channel_id",
+    "thread_id",
+    "starter_message_id",
+    "card_message_id",
+    "post_status",
+    "last_posted_at",
+    "last_synced_at",
+    "last_error",
+]
 
 ORDERED_FIELDS = [
     "_id",
@@ -38,6 +52,7 @@ ORDERED_FIELDS = [
     "discord",
     "admin",
     "status_history",
+    "schema_version",
 ]
 
 
@@ -45,47 +60,30 @@ def utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
-def default_discord_block(doc: dict[str, Any]) -> dict[str, Any]:
-    return {
-        "starter_body": generated_starter_body(doc),
-        "posts": [],
-    }
-
-
 def normalize_discord_block(doc: dict[str, Any]) -> dict[str, Any]:
     existing = dict(doc.get("discord") or {})
-    defaults = default_discord_block(doc)
-    merged = {}
-    for key, value in defaults.items():
-        merged[key] = existing.get(key, value)
+    merged = {
+        "starter_body": existing["starter_body"] if "starter_body" in existing else generated_starter_body(doc),
+        "posts": existing.get("posts") or [],
+    }
 
-    posts = list(merged.get("posts") or [])
-    if not posts and merged.get("guild_id") and merged.get("thread_id"):
+    posts = list(merged["posts"])
+    if not posts and existing.get("guild_id") and existing.get("thread_id"):
         posts.append({
-            "guild_id": merged.get("guild_id"),
-            "forum_channel_id": merged.get("forum_channel_id"),
-            "thread_id": merged.get("thread_id"),
-            "starter_message_id": merged.get("starter_message_id"),
-            "card_message_id": merged.get("card_message_id"),
-            "post_status": merged.get("post_status") or "posted",
-            "last_posted_at": merged.get("last_posted_at"),
-            "last_synced_at": merged.get("last_synced_at"),
-            "last_error": merged.get("last_error"),
+            "guild_id": existing.get("guild_id"),
+            "forum_channel_id": existing.get("forum_channel_id"),
+            "thread_id": existing.get("thread_id"),
+            "starter_message_id": existing.get("starter_message_id"),
+            "card_message_id": existing.get("card_message_id"),
+            "post_status": existing.get("post_status") or "posted",
+            "last_posted_at": existing.get("last_posted_at"),
+            "last_synced_at": existing.get("last_synced_at"),
+            "last_error": existing.get("last_error"),
         })
     merged["posts"] = posts
 
     for key, value in existing.items():
-        if key not in merged and key not in {
-            "guild_id",
-            "forum_channel_id",
-            "thread_id",
-            "starter_message_id",
-            "card_message_id",
-            "post_status",
-            "last_posted_at",
-            "last_synced_at",
-            "last_error",
-        }:
+        if key not in merged and key not in LEGACY_DISCORD_FIELDS:
             merged[key] = value
     return merged
 
@@ -94,6 +92,7 @@ def normalize_doc(doc: dict[str, Any]) -> dict[str, Any]:
     normalized = dict(doc)
     normalized["scope"] = normalized.get("scope") or "full"
     normalized["discord"] = normalize_discord_block(normalized)
+    normalized["schema_version"] = SCHEMA_VERSION
 
     ordered = {}
     for field in ORDERED_FIELDS:
@@ -106,56 +105,73 @@ def normalize_doc(doc: dict[str, Any]) -> dict[str, Any]:
     return ordered
 
 
+def pending_query(include_current: bool = False) -> dict[str, Any]:
+    # $not also matches documents that have no schema_version at all.
+    return {} if include_current else {"schema_version": {"$not": {"$gte": SCHEMA_VERSION}}}
+
+
 def backfill(args: argparse.Namespace) -> int:
     load_dotenv()
     mongo_uri = args.mongo_uri or os.getenv("MONGODB_URI")
     if not mongo_uri:
         raise RuntimeError("Provide --mongo-uri or set MONGODB_URI.")
 
-    client = MongoClient(mongo_uri)
+    client = get_client(mongo_uri)
     db = client[args.database]
     characters = db[CHARACTER_COLLECTION]
     audit = db[AUDIT_COLLECTION]
 
-    docs = list(characters.find({}).sort("name", 1))
-    writes = []
+    matched = 0
     changed = 0
-    for doc in docs:
-        normalized = normalize_doc(doc)
-        if normalized != doc:
+    written = 0
+    writes = []
+
+    def flush() -> None:
+        nonlocal written
+        if writes and not args.dry_run:
+            written += characters.bulk_write(writes, ordered=False).modified_count
+        writes.clear()
+
+    # Documents are streamed and replaced in batches, so memory stays flat however
+    # large the collection is. Each replace only applies if the document has not
+    # been updated since it was read; a skipped document is normalized on its next
+    # read by the bot, or by the next run.
+    with characters.find(pending_query(args.all)).sort("_id", 1).batch_size(args.batch_size) as cursor:
+        for doc in cursor:
+            matched += 1
+            normalized = normalize_doc(doc)
+            if normalized == doc:
+                continue
             changed += 1
-            writes.append(ReplaceOne({"_id": doc["_id"]}, normalized))
+            updated_at = (doc.get("admin") or {}).get("updated_at")
+            writes.append(ReplaceOne({"_id": doc["_id"], "admin.updated_at": updated_at}, normalized))
+            if len(writes) >= args.batch_size:
+                flush()
+    flush()
 
     if args.dry_run:
-        print(f"Dry run: {changed} of {len(docs)} document(s) need backfill/reorder.")
+        print(f"Dry run: {changed} of {matched} document(s) need migration to schema version {SCHEMA_VERSION}.")
         return 0
 
-    if writes:
-        characters.bulk_write(writes, ordered=False)
+    if changed:
         audit.insert_one({
             "character_id": None,
             "actor_id": "system",
             "kind": "cardmaker_schema_backfill",
             "details": {
-                "matched": len(docs),
+                "schema_version": SCHEMA_VERSION,
+                "matched": matched,
                 "changed": changed,
-                "fields": ["scope", "discord.starter_body", "discord.posts"],
-                "removed_legacy_discord_fields": [
-                    "guild_id",
-                    "forum_channel_id",
-                    "thread_id",
-                    "starter_message_id",
-                    "card_message_id",
-                    "post_status",
-                    "last_posted_at",
-                    "last_synced_at",
-                    "last_error",
-                ],
+                "written": written,
+                "fields": ["scope", "discord.starter_body", "discord.posts", "schema_version"],
+                "removed_legacy_discord_fields": LEGACY_DISCORD_FIELDS,
             },
             "created_at": utc_now(),
         })
 
-    print(f"Backfilled/reordered {changed} of {len(docs)} document(s).")
+    print(f"Migrated {written} of {matched} document(s) to schema version {SCHEMA_VERSION}.")
+    if written < changed:
+        print(f"{changed - written} document(s) changed while migrating and were left for the next run.")
     return 0
 
 
@@ -163,6 +179,8 @@ def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Backfill cardmaker MongoDB schema fields.")
     parser.add_argument("--mongo-uri", help="MongoDB connection string. Defaults to MONGODB_URI.")
     parser.add_argument("--database", default=DEFAULT_DATABASE, help="MongoDB database name.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Documents read and replaced per batch.")
+    parser.add_argument("--all", action="store_true", help="Re-normalize every document, not only those below the current schema version.")
     parser.add_argument("--dry-run", action="store_true", help="Report changes without writing.")
     return parser.parse_args()
 
@@ -0,0 +1,210 @@
+"""
+Rendering benchmarks for the cardmaker renderer.
+
+Each scenario runs in a fresh process, so the reported peak memory is the growth
+of the process's maximum resident set size over its own baseline after imports.
+
+    python -m cogs_cardmaker.benchmark --design default-rotw --iterations 5
+    python -m cogs_cardmaker.benchmark --scenario warm --json
+    python -m cogs_cardmaker.benchmark --resample --source path/to/photo.jpg
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import multiprocessing
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+
+from PIL import Image, ImageChops, ImageStat
+
+from cogs_cardmaker.card import CardGenerator, cover_box, resample
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _max_rss_bytes() -> int | None:
+    if resource is None:
+        return None
+    # ru_maxrss is reported in KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def sample_character(generator: CardGenerator) -> dict[str, Any]:
+    return dict(generator.layout_cfg.get("character") or {
+        "name": "Benchmark Character",
+        "role": "Master",
+        "username": "@benchmark",
+        "affiliation": "Benchmark Affiliation",
+        "occupation": "Benchmark Occupation",
+        "alignment": "True Neutral",
+        "footer_text": "Rest of the World",
+    })
+
+
+def _scenario_cold(design: str) -> Callable[[], Any]:
+    # A new generator per render: config load, asset decode and full composition.
+    character = sample_character(CardGenerator(design))
+    return lambda: CardGenerator(design).render(character)
+
+
+def _scenario_warm(design: str) -> Callable[[], Any]:
+    # A long-lived generator: base layers are reused, only card-specific parts are drawn.
+    generator = CardGenerator(design)
+    character = sample_character(generator)
+    generator.render(character)
+    return lambda: generator.render(character)
+
+
+def _scenario_runtime_background(design: str) -> Callable[[], Any]:
+    # One-off custom background: the image stack is composited on every render.
+    generator = CardGenerator(design)
+    character = sample_character(generator)
+    background = Image.new("RGBA", (4000, 2500), (90, 60, 140, 255))
+    runtime_images = {"background": background}
+    generator.render(character, runtime_images=runtime_images)
+    return lambda: generator.render(character, runtime_images=runtime_images)
+
+
+SCENARIOS: dict[str, Callable[[str], Callable[[], Any]]] = {
+    "cold": _scenario_cold,
+    "warm": _scenario_warm,
+    "runtime-background": _scenario_runtime_background,
+}
+
+
+def run_scenario(name: str, design: str, iterations: int) -> dict[str, Any]:
+    rss_before = _max_rss_bytes()
+    render = SCENARIOS[name](design)
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        render()
+        timings.append((time.perf_counter() - start) * 1000)
+    rss_after = _max_rss_bytes()
+    return {
+        "scenario": name,
+        "design": design,
+        "iterations": iterations,
+        "mean_ms": statistics.fmean(timings),
+        "min_ms": min(timings),
+        "peak_rss_growth_mb": (rss_after - rss_before) / (1024 * 1024) if rss_before is not None else None,
+    }
+
+
+def psnr(a: Image.Image, b: Image.Image) -> float:
+    diff = ImageChops.difference(a.convert("RGB"), b.convert("RGB"))
+    mse = statistics.fmean(rms ** 2 for rms in ImageStat.Stat(diff).rms)
+    return math.inf if mse == 0 else 10 * math.log10(255 ** 2 / mse)
+
+
+def _time_ms(func: Callable[[], Any], repeats: int) -> tuple[float, Any]:
+    best, result = math.inf, None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best, result
+
+
+def resample_source(design: str, source: str | None) -> Image.Image:
+    if source:
+        return Image.open(source).convert("RGBA")
+    # Without a real photo, upscale the design's first image layer to a typical upload size.
+    generator = CardGenerator(design)
+    layout = generator._layout_for("master")
+    path = next(layer["path"] for layer in layout["layers"]["image_layers"] if "path" in layer)
+    image = generator._load_image(path, template_role="master")
+    return image.resize((4000, round(4000 * image.height / image.width)), Image.Resampling.BICUBIC)
+
+
+def compare_resampling(image: Image.Image, targets: dict[str, tuple[int, int]], repeats: int) -> list[dict[str, Any]]:
+    """Time direct LANCZOS against the two-stage path and report how far apart the results are."""
+    results = []
+    for name, size in targets.items():
+        box = cover_box(image.size, size)
+        direct_ms, direct = _time_ms(lambda: image.resize(size, Image.Resampling.LANCZOS, box=box), repeats)
+        two_stage_ms, two_stage = _time_ms(lambda: resample(image, size, box=box), repeats)
+        results.append({
+            "target": name,
+            "source": list(image.size),
+            "size": list(size),
+            "direct_ms": direct_ms,
+            "two_stage_ms": two_stage_ms,
+            "speedup": direct_ms / two_stage_ms if two_stage_ms else math.inf,
+            "psnr_db": psnr(direct, two_stage),
+        })
+    return results
+
+
+def run_isolated(name: str, design: str, iterations: int) -> dict[str, Any]:
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(run_scenario, name, design, iterations).result()
+
+
+def benchmark_resampling(args: argparse.Namespace) -> int:
+    image = resample_source(args.design, args.source)
+    generator = CardGenerator(args.design)
+    avatar = generator._layout_for("master")["avatar"]
+    targets = {
+        "avatar": generator._avatar_size(avatar),
+        "canvas": generator.canvas_size,
+    }
+    results = compare_resampling(image, targets, max(1, args.iterations))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"Source: {image.width}x{image.height} (best of {max(1, args.iterations)})")
+    print(f"{'target':<12}{'size':>12}{'direct ms':>12}{'2-stage ms':>12}{'speedup':>10}{'PSNR dB':>10}")
+    for result in results:
+        size = "x".join(str(n) for n in result["size"])
+        print(
+            f"{result['target']:<12}{size:>12}{result['direct_ms']:>12.1f}"
+            f"{result['two_stage_ms']:>12.1f}{result['speedup']:>9.1f}x{result['psnr_db']:>10.1f}"
+        )
+    return 0
+
+
+def benchmark(args: argparse.Namespace) -> int:
+    if args.resample:
+        return benchmark_resampling(args)
+
+    names = args.scenario or list(SCENARIOS)
+    results = [run_isolated(name, args.design, args.iterations) for name in names]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"Design: {args.design} ({args.iterations} iteration(s) per scenario)")
+    print(f"{'scenario':<24}{'mean ms':>10}{'min ms':>10}{'peak MB':>10}")
+    for result in results:
+        peak = result["peak_rss_growth_mb"]
+        peak_text = f"{peak:.1f}" if peak is not None else "n/a"
+        print(f"{result['scenario']:<24}{result['mean_ms']:>10.1f}{result['min_ms']:>10.1f}{peak_text:>10}")
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark cardmaker rendering time and peak memory.")
+    parser.add_argument("--design", default="default-rotw", help="Design name, design folder, or config.json path.")
+    parser.add_argument("--iterations", type=int, default=5, help="Timed renders per scenario.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Scenario to run. Repeat for several; defaults to all.")
+    parser.add_argument("--resample", action="store_true", help="Compare direct LANCZOS with two-stage downscaling instead.")
+    parser.add_argument("--source", help="Source image for --resample. Defaults to an upscaled design layer.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    raise SystemExit(benchmark(parse_args()))
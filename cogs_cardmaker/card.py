@@ -2,9 +2,17 @@ import json
 import sys
 import argparse
 import copy
+import hashlib
+import io
 import os
+import shutil
+import struct
+import threading
+import unicodedata
+import zlib
+from collections import OrderedDict
 from pathlib import Path
-from PIL import Image, ImageDraw, ImageFont, ImageOps
+from PIL import Image, ImageDraw, ImageFont, ImageSequence
 from pymongo import MongoClient
 
 
@@ -14,17 +22,350 @@ class Defaults:
     DESIGNS_DIR = BASE_DIR / "designs"
     FONTS_DIR = BASE_DIR / "fonts"
     FACECLAIMS_DIR = BASE_DIR / "faceclaims"
+    FACECLAIM_QUARANTINE_DIR = BASE_DIR / "faceclaims_quarantine"
     OUTPUT_DIR = BASE_DIR / "outputs"
+    EXPORTS_DIR = OUTPUT_DIR / "exports"
+    OUTPUT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+    TEXT_SPRITE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+    TEXT_SEGMENT_CACHE_MAX_ENTRIES = 4096
+    RESAMPLE_REDUCING_GAP = 2.0
+    ANIMATION_MAX_FRAMES = 120
+    ANIMATION_DEFAULT_FRAME_MS = 100
     MONGO_DATABASE = "grail-kun"
     MONGO_CHARACTER_COLLECTION = "cardmaker_characters"
 
 
+# Bump when a renderer change alters output for unchanged inputs, so cached
+# renders from older code are not served.
+RENDERER_VERSION = 3
+
+
+class TextSpriteCache:
+    """
+    Memory-bounded LRU of pre-rasterized text runs.
+
+    Footers, role labels and alignments repeat across most cards, so each distinct
+    (text, font chain, size, weight, color, anchor) run is rasterized once into a
+    tightly cropped RGBA sprite and alpha-composited onto later cards.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._sprites = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build):
+        with self._lock:
+            entry = self._sprites.get(key)
+            if entry is not None:
+                self._sprites.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        entry = build()
+        sprite = entry[0]
+        size = sprite.width * sprite.height * 4 if sprite else 0
+        if size > self.max_bytes:
+            return entry
+
+        with self._lock:
+            if key not in self._sprites:
+                self._sprites[key] = entry
+                self._bytes += size
+            while self._bytes > self.max_bytes and self._sprites:
+                _, (old_sprite, _) = self._sprites.popitem(last=False)
+                self._bytes -= old_sprite.width * old_sprite.height * 4 if old_sprite else 0
+        return entry
+
+    def discard_fonts(self, font_paths):
+        """Drop sprites rasterized with any of the given font files."""
+        with self._lock:
+            for key in [key for key in self._sprites if any(font_file(path) in font_paths for path in key[1])]:
+                sprite, _ = self._sprites.pop(key)
+                self._bytes -= sprite.width * sprite.height * 4 if sprite else 0
+
+    def clear(self):
+        with self._lock:
+            self._sprites.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._sprites),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def font_file(path):
+    """Resolve a font path from a design config against the fonts folder."""
+    font_path = Path(path)
+    return font_path if font_path.is_absolute() else Defaults.FONTS_DIR / font_path
+
+
+def _cmap_codepoints(data):
+    """Yield the code points mapped to a real glyph by a TrueType/OpenType font's Unicode cmaps."""
+    offset = struct.unpack_from(">I", data, 12)[0] if data[:4] == b"ttcf" else 0
+    num_tables = struct.unpack_from(">H", data, offset + 4)[0]
+    cmap = None
+    for i in range(num_tables):
+        tag, _, table_offset, _ = struct.unpack_from(">4sIII", data, offset + 12 + i * 16)
+        if tag == b"cmap":
+            cmap = table_offset
+            break
+    if cmap is None:
+        return
+
+    for i in range(struct.unpack_from(">H", data, cmap + 2)[0]):
+        platform, encoding, subtable = struct.unpack_from(">HHI", data, cmap + 4 + i * 8)
+        if platform != 0 and not (platform == 3 and encoding in (1, 10)):
+            continue
+        start = cmap + subtable
+        fmt = struct.unpack_from(">H", data, start)[0]
+        if fmt == 4:
+            seg_count = struct.unpack_from(">H", data, start + 6)[0] // 2
+            ends = struct.unpack_from(f">{seg_count}H", data, start + 14)
+            firsts = struct.unpack_from(f">{seg_count}H", data, start + 16 + seg_count * 2)
+            deltas = struct.unpack_from(f">{seg_count}H", data, start + 16 + seg_count * 4)
+            range_offsets_at = start + 16 + seg_count * 6
+            range_offsets = struct.unpack_from(f">{seg_count}H", data, range_offsets_at)
+            for seg, (first, end, delta, range_offset) in enumerate(zip(firsts, ends, deltas, range_offsets)):
+                if first == 0xFFFF:
+                    continue
+                if range_offset == 0:
+                    yield from (c for c in range(first, end + 1) if (c + delta) & 0xFFFF)
+                    continue
+                glyphs_at = range_offsets_at + seg * 2 + range_offset
+                glyphs = struct.unpack_from(f">{end - first + 1}H", data, glyphs_at)
+                yield from (first + n for n, glyph in enumerate(glyphs) if glyph)
+        elif fmt == 12:
+            for n in range(struct.unpack_from(">I", data, start + 12)[0]):
+                first, end, glyph = struct.unpack_from(">III", data, start + 16 + n * 12)
+                yield from range(first if glyph else first + 1, end + 1)
+
+
+class GlyphCoverage:
+    """Bitmap of the Unicode code points a font file has glyphs for."""
+
+    def __init__(self, codepoints):
+        self._bits = bytearray(0x110000 // 8)
+        for codepoint in codepoints:
+            if codepoint < 0x110000:
+                self._bits[codepoint >> 3] |= 1 << (codepoint & 7)
+
+    def __contains__(self, codepoint):
+        return bool(self._bits[codepoint >> 3] >> (codepoint & 7) & 1)
+
+
+_coverage_cache = {}
+_coverage_lock = threading.Lock()
+
+
+def font_coverage(path):
+    """Return the cached GlyphCoverage of a font file, re-reading it only when the file changes."""
+    path = font_file(path)
+    stat = path.stat()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _coverage_lock:
+        entry = _coverage_cache.get(path)
+    if entry is not None and entry[0] == stamp:
+        return entry[1]
+    coverage = GlyphCoverage(_cmap_codepoints(path.read_bytes()))
+    with _coverage_lock:
+        _coverage_cache[path] = (stamp, coverage)
+    return coverage
+
+
+_NO_COVERAGE = GlyphCoverage(())
+_skipped_fonts = set()
+
+
+def skip_fallback_font(path, exc):
+    """Warn, once per file, that a fallback font cannot be used."""
+    path = font_file(path)
+    with _coverage_lock:
+        first = path not in _skipped_fonts
+        _skipped_fonts.add(path)
+    if first:
+        print(f"Skipping fallback font {path}: {exc}")
+
+
+def fallback_coverage(path):
+    """font_coverage for a fallback font, or no coverage when the file cannot be read."""
+    try:
+        return font_coverage(path)
+    except (OSError, ValueError, struct.error) as exc:
+        skip_fallback_font(path, exc)
+        return _NO_COVERAGE
+
+
+def _sticks_to_run(char):
+    # Spaces, combining marks, joiners and variation selectors belong to the run
+    # they follow, so they never split a word or an emoji sequence across fonts.
+    return char.isspace() or unicodedata.category(char) in ("Mn", "Me", "Cf") or "\ufe00" <= char <= "\ufe0f"
+
+
+class TextSegmentCache:
+    """
+    LRU of text split into runs by the first font in a fallback chain with the glyphs.
+
+    Each character is looked up in the cached coverage bitmaps once, so splitting is
+    linear in the text length; repeated strings such as footers and labels reuse
+    their runs.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._segments = OrderedDict()
+        self._lock = threading.Lock()
+
+    def segment(self, text, font_paths):
+        """Return (run, font index) pairs covering `text`; index 0 is the primary font."""
+        key = (text, font_paths)
+        with self._lock:
+            runs = self._segments.get(key)
+            if runs is not None:
+                self._segments.move_to_end(key)
+                return runs
+
+        # A broken fallback only loses its glyphs; a broken primary font still fails the render.
+        coverages = [font_coverage(path) if n == 0 else fallback_coverage(path) for n, path in enumerate(font_paths)]
+        runs = []
+        current, start = None, 0
+        for i, char in enumerate(text):
+            if current is not None and _sticks_to_run(char):
+                continue
+            codepoint = ord(char)
+            index = next((n for n, coverage in enumerate(coverages) if codepoint in coverage), 0)
+            if index != current:
+                if current is not None:
+                    runs.append((text[start:i], current))
+                current, start = index, i
+        if current is not None:
+            runs.append((text[start:], current))
+        runs = tuple(runs)
+
+        with self._lock:
+            self._segments[key] = runs
+            while len(self._segments) > self.max_entries:
+                self._segments.popitem(last=False)
+        return runs
+
+    def discard_fonts(self, font_paths):
+        """Drop segmentations that used any of the given font files."""
+        with self._lock:
+            for key in [key for key in self._segments if any(font_file(path) in font_paths for path in key[1])]:
+                del self._segments[key]
+
+    def clear(self):
+        with self._lock:
+            self._segments.clear()
+
+
+text_sprite_cache = TextSpriteCache(Defaults.TEXT_SPRITE_CACHE_MAX_BYTES)
+text_segment_cache = TextSegmentCache(Defaults.TEXT_SEGMENT_CACHE_MAX_ENTRIES)
+
+
+def resample(image, size, box=None, reducing_gap=Defaults.RESAMPLE_REDUCING_GAP):
+    """
+    LANCZOS resize that first box-reduces large downscales by an integer factor.
+
+    The integer reduction stops at about `reducing_gap` times the target size, so
+    LANCZOS only runs over a small source. Upscales are unaffected.
+    """
+    # Image.resize ignores reducing_gap for RGBA, so premultiply here instead.
+    if image.mode == "RGBA":
+        premultiplied = image.convert("RGBa")
+        return premultiplied.resize(size, Image.Resampling.LANCZOS, box=box, reducing_gap=reducing_gap).convert("RGBA")
+    return image.resize(size, Image.Resampling.LANCZOS, box=box, reducing_gap=reducing_gap)
+
+
+def cover_box(image_size, size):
+    """Centered source region with the aspect ratio of `size`, as used by ImageOps.fit."""
+    img_w, img_h = image_size
+    target_w, target_h = size
+    if img_w * target_h > img_h * target_w:
+        crop_w, crop_h = img_h * target_w / target_h, img_h
+    else:
+        crop_w, crop_h = img_w, img_w * target_h / target_w
+    left, top = (img_w - crop_w) / 2, (img_h - crop_h) / 2
+    return left, top, left + crop_w, top + crop_h
+
+
+def _png_chunks(image):
+    buf = io.BytesIO()
+    image.save(buf, "PNG")
+    data = buf.getvalue()
+    chunks, pos = [], 8
+    while pos < len(data):
+        length, chunk_type = struct.unpack(">I4s", data[pos:pos + 8])
+        chunks.append((chunk_type, data[pos + 8:pos + 8 + length]))
+        pos += length + 12
+    return chunks
+
+
+def _chunk(chunk_type, body):
+    return struct.pack(">I", len(body)) + chunk_type + body + struct.pack(">I", zlib.crc32(chunk_type + body) & 0xFFFFFFFF)
+
+
+def encode_apng(first, regions, offset, loop=0):
+    """
+    Encode an APNG whose later frames only redraw one region of the first.
+
+    `first` is the complete first frame. `regions` is a list of (image, duration_ms)
+    for every frame, all the same size and placed at `offset`; the first entry only
+    supplies the first frame's duration. Later frames are stored as region-sized
+    sub-frames that replace those pixels, so output size and encode time scale with
+    the region rather than the full canvas.
+    """
+    first = first.convert("RGBA")
+    sequence = 0
+    out = [b"\x89PNG\r\n\x1a\n"]
+
+    def frame_control(size, position, duration):
+        nonlocal sequence
+        body = struct.pack(">IIIIIHHBB", sequence, size[0], size[1], position[0], position[1], min(int(duration), 0xFFFF), 1000, 0, 0)
+        sequence += 1
+        return _chunk(b"fcTL", body)
+
+    chunks = _png_chunks(first)
+    out.append(_chunk(b"IHDR", dict(chunks)[b"IHDR"]))
+    out.append(_chunk(b"acTL", struct.pack(">II", len(regions), loop)))
+    out.append(frame_control(first.size, (0, 0), regions[0][1]))
+    out.extend(_chunk(b"IDAT", body) for chunk_type, body in chunks if chunk_type == b"IDAT")
+
+    for region, duration in regions[1:]:
+        out.append(frame_control(region.size, offset, duration))
+        for chunk_type, body in _png_chunks(region.convert("RGBA")):
+            if chunk_type == b"IDAT":
+                out.append(_chunk(b"fdAT", struct.pack(">I", sequence) + body))
+                sequence += 1
+    out.append(_chunk(b"IEND", b""))
+    return b"".join(out)
+
+
 class CardGenerator:
     def __init__(self, layout_name):
         self.design_dir = None
+        self.layout_path = None
+        self._design_fingerprint = None
         self.layout_cfg = self._load_layout(layout_name)
         self.font_cache = {}
         self.asset_cache = {}
+        self.layout_cache = {}
+        self.canvas_cache = {}
+        self.overlay_cache = {}
+        # Render workers fill the caches while the design watcher invalidates them.
+        self._lock = threading.Lock()
         self.canvas_size = (
             self.layout_cfg["canvas"]["width"],
             self.layout_cfg["canvas"]["height"]
@@ -60,6 +401,7 @@ class CardGenerator:
             raise FileNotFoundError(f"Layout not found. Searched: {searched}")
 
         self.design_dir = layout_path.parent if layout_path.name == "config.json" else None
+        self.layout_path = layout_path
 
         with open(layout_path, "r", encoding="utf-8") as f:
             config = json.load(f)
@@ -79,6 +421,109 @@ class CardGenerator:
             
         return config
 
+    def design_fingerprint(self):
+        """Hash the design config plus the stat of every asset it can draw from."""
+        if not self._design_fingerprint:
+            self._design_fingerprint = self._design_stamp()
+        return self._design_fingerprint
+
+    def is_stale(self):
+        """True when the design config or any of its assets changed since loading."""
+        return self._design_stamp() != self.design_fingerprint()
+
+    def _design_stamp(self):
+        digest = hashlib.sha256(self.layout_path.read_bytes())
+        asset_paths = []
+        if self.design_dir:
+            asset_paths.extend(path for path in self.design_dir.rglob("*") if path.is_file())
+        asset_paths.extend(self._font_files())
+        for path in sorted(set(asset_paths)):
+            stat = path.stat() if path.exists() else None
+            stamp = f"{path}:{stat.st_mtime_ns}:{stat.st_size}" if stat else f"{path}:missing"
+            digest.update(stamp.encode("utf-8"))
+        return digest.hexdigest()
+
+    def render_fingerprint(self, data):
+        """Identify the exact output `render` would produce for this character data."""
+        template_role = self._template_role_for(data)
+        layout = self._layout_for(template_role)
+        fields = sorted({cfg.get("field", key) for key, cfg in layout.get("text", {}).items()})
+        avatar_stamp = None
+        avatar_path = data.get("avatar_path")
+        if avatar_path:
+            path = Path(avatar_path)
+            if not path.is_absolute():
+                path = Defaults.FACECLAIMS_DIR / path
+            if path.exists():
+                stat = path.stat()
+                avatar_stamp = [str(path), stat.st_mtime_ns, stat.st_size]
+
+        payload = {
+            "renderer": RENDERER_VERSION,
+            "design": self.design_fingerprint(),
+            "role": template_role,
+            "fields": {field: data.get(field) for field in fields},
+            "avatar": avatar_stamp,
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _layout_for(self, template_role):
+        """Resolved layout for a role, built once per generator. Treat as read-only."""
+        layout = self.layout_cache.get(template_role)
+        if layout is None:
+            layout = self._resolved_layout(template_role)
+            with self._lock:
+                self.layout_cache[template_role] = layout
+        return layout
+
+    def _base_canvas(self, template_role):
+        """Image layers for a role without runtime images, composited once per generator."""
+        canvas = self.canvas_cache.get(template_role)
+        if canvas is None:
+            layout = self._layout_for(template_role)
+            canvas = self._create_base_canvas(layout, template_role)
+            with self._lock:
+                self.canvas_cache[template_role] = canvas
+        return canvas
+
+    def warm(self, template_role):
+        """Build the shared per-role state so later renders only draw the card-specific parts."""
+        self._base_canvas(template_role)
+
+    def invalidate(self, changed_paths):
+        """
+        Drop cached state derived from changed design or font files.
+
+        Returns the template roles whose base canvas was dropped, or None when the
+        design config itself changed and the generator has to be rebuilt.
+        """
+        changed = {Path(path) for path in changed_paths}
+        fonts = self._font_files()
+        if not any(path in fonts or (self.design_dir and self.design_dir in path.parents) for path in changed):
+            return set()
+        if self.layout_path in changed:
+            return None
+
+        with self._lock:
+            roles = list(self.canvas_cache)
+        layouts = {role: self._layout_for(role) for role in roles}
+        dropped = set()
+        with self._lock:
+            for key in [key for key in self.asset_cache if self._asset_path(key[0]) in changed]:
+                del self.asset_cache[key]
+            for role, layout in layouts.items():
+                layers = layout["layers"]["image_layers"]
+                if role in self.canvas_cache and any("path" in layer and self._asset_path(layer["path"]) in changed for layer in layers):
+                    del self.canvas_cache[role]
+                    dropped.add(role)
+
+            for key in [key for key in self.font_cache if font_file(key[0]) in changed]:
+                del self.font_cache[key]
+
+            self._design_fingerprint = None
+        return dropped
+
     def _resolved_layout(self, template_role):
         layout = copy.deepcopy(self.layout_cfg)
         template = layout.pop("templates", {}).get(template_role, {})
@@ -93,20 +538,52 @@ class CardGenerator:
                 merged[key] = copy.deepcopy(value)
         return merged
 
+    def _font_chain(self, font_config):
+        """Font paths tried in order for each character: the font itself, then its fallbacks."""
+        fallbacks = font_config.get("fallbacks", self.layout_cfg.get("font_fallbacks", []))
+        return (font_config["path"], *fallbacks)
+
+    def _font_files(self):
+        font_configs = list(self.layout_cfg.get("fonts", {}).values())
+        for template in self.layout_cfg.get("templates", {}).values():
+            font_configs.extend(template.get("fonts", {}).values())
+        return {font_file(path) for font_config in font_configs if "path" in font_config for path in self._font_chain(font_config)}
+
+    def _font_runs(self, text, font, font_config):
+        """Split text into (run, font) pairs using the font's fallback chain."""
+        chain = self._font_chain(font_config)
+        if len(chain) == 1:
+            return [(text, font)]
+        return [
+            (run, font if index == 0 else self._fallback_font(chain[index], font))
+            for run, index in text_segment_cache.segment(text, chain)
+        ]
+
+    def _fallback_font(self, path, font):
+        try:
+            return self._get_font({"path": path}, font.size)
+        except OSError as exc:
+            skip_fallback_font(path, exc)
+            return font
+
+    def _text_width(self, draw, text, font, font_config):
+        runs = self._font_runs(text, font, font_config)
+        if len(runs) == 1:
+            bbox = draw.textbbox((0, 0), text, font=runs[0][1])
+            return bbox[2] - bbox[0]
+        return sum(run_font.getlength(run) for run, run_font in runs)
+
     def _get_font(self, font_config, size=None, weight=None):
         """Load and cache fonts to improve performance."""
         size = size or font_config["size"]
         weight = weight or font_config.get("weight")
         cache_key = (font_config["path"], size, weight)
 
-        if cache_key in self.font_cache:
-            return self.font_cache[cache_key]
-
-        font_path = Path(font_config["path"])
-        if not font_path.is_absolute():
-            font_path = Defaults.FONTS_DIR / font_path
+        font = self.font_cache.get(cache_key)
+        if font is not None:
+            return font
 
-        font = ImageFont.truetype(str(font_path), size)
+        font = ImageFont.truetype(str(font_file(font_config["path"])), size)
         
         if weight:
             try:
@@ -123,7 +600,8 @@ class CardGenerator:
             except Exception:
                 pass # Graceful fallback for non-variable fonts or incompatible Pillow versions
         
-        self.font_cache[cache_key] = font
+        with self._lock:
+            self.font_cache[cache_key] = font
         return font
 
     def _template_role_for(self, data):
@@ -141,20 +619,16 @@ class CardGenerator:
     def _load_image(self, path, is_faceclaim=False, template_role=None, missing_ok=False):
         """Load and cache card design assets."""
         cache_key = (str(path), template_role)
-        if cache_key in self.asset_cache and not is_faceclaim:
-            return self.asset_cache[cache_key]
+        cached = None if is_faceclaim else self.asset_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         img_path = Path(path)
         if not img_path.is_absolute():
             if is_faceclaim:
                 img_path = Defaults.FACECLAIMS_DIR / img_path
             else:
-                candidates = []
-                if self.design_dir:
-                    candidates.append(self.design_dir / img_path)
-                if not candidates:
-                    candidates.append(img_path)
-                img_path = next((candidate for candidate in candidates if candidate.exists()), candidates[0])
+                img_path = self._asset_path(img_path)
 
         if not img_path.exists():
             if missing_ok:
@@ -163,26 +637,45 @@ class CardGenerator:
 
         img = Image.open(img_path).convert("RGBA")
         if not is_faceclaim:
-            self.asset_cache[cache_key] = img
+            with self._lock:
+                self.asset_cache[cache_key] = img
         return img
 
+    def _asset_path(self, path):
+        img_path = Path(path)
+        if img_path.is_absolute() or not self.design_dir:
+            return img_path
+        return self.design_dir / img_path
+
     def _fit_image(self, image, size, mode="cover"):
+        """
+        Resize a layer for a canvas of `size` and return it with its paste offset.
+
+        Only the part of the source that ends up on the canvas is resampled, and the
+        result covers just the destination rectangle rather than a full canvas.
+        """
         target_w, target_h = size
+        if image.size == tuple(size):
+            return image, (0, 0)
         if mode == "stretch":
-            return image.resize(size, Image.Resampling.LANCZOS)
+            return resample(image, size), (0, 0)
 
         img_w, img_h = image.size
         if mode == "cover":
             scale = max(target_w / img_w, target_h / img_h)
         else: # contain
             scale = min(target_w / img_w, target_h / img_h)
-        
+
         new_w, new_h = int(img_w * scale), int(img_h * scale)
-        resized = image.resize((new_w, new_h), Image.Resampling.LANCZOS)
-        
-        canvas = Image.new("RGBA", size, (0, 0, 0, 0))
-        canvas.alpha_composite(resized, ((target_w - new_w) // 2, (target_h - new_h) // 2))
-        return canvas
+        left, top = (target_w - new_w) // 2, (target_h - new_h) // 2
+
+        # Visible part of the scaled image, in scaled coordinates.
+        x0, y0 = max(0, -left), max(0, -top)
+        x1, y1 = min(new_w, target_w - left), min(new_h, target_h - top)
+        step_x, step_y = img_w / new_w, img_h / new_h
+        box = (x0 * step_x, y0 * step_y, x1 * step_x, y1 * step_y)
+        resized = resample(image, (x1 - x0, y1 - y0), box=box)
+        return resized, (left + x0, top + y0)
 
     def _avatar_size(self, avatar_config):
         size = avatar_config.get("size")
@@ -233,7 +726,7 @@ class CardGenerator:
 
     def _prepare_avatar(self, image, avatar_config):
         size = self._avatar_size(avatar_config)
-        avatar = ImageOps.fit(image, size, centering=(0.5, 0.5))
+        avatar = image if image.size == size else resample(image, size, box=cover_box(image.size, size))
         mask = self._avatar_mask(avatar_config, size)
         if mask is None:
             return avatar
@@ -245,7 +738,7 @@ class CardGenerator:
     def supports_runtime_image(self, slot, template_role=None):
         roles = [template_role] if template_role else ["master", "servant"]
         for role in roles:
-            layout = self._resolved_layout(role)
+            layout = self._layout_for(role)
             for layer_cfg in layout.get("layers", {}).get("image_layers", []):
                 if layer_cfg.get("customizable") == slot:
                     return True
@@ -272,7 +765,7 @@ class CardGenerator:
             if source_img is None:
                 source_img = self._load_image(layer_cfg["path"], template_role=template_role)
 
-            layer_img = self._fit_image(
+            layer_img, offset = self._fit_image(
                 source_img,
                 self.canvas_size,
                 layer_cfg.get("fit", "cover")
@@ -281,18 +774,17 @@ class CardGenerator:
             if opacity <= 1:
                 opacity = int(opacity * 255)
             if opacity < 255:
-                r, g, b, a = layer_img.split()
-                a = a.point(lambda p: int(p * (opacity / 255)))
+                if layer_img is source_img:
+                    layer_img = layer_img.copy()
+                a = layer_img.getchannel("A").point(lambda p: int(p * (opacity / 255)))
                 layer_img.putalpha(a)
-            canvas.alpha_composite(layer_img)
+            canvas.alpha_composite(layer_img, offset)
         return canvas
 
     def _apply_color_overlay(self, canvas, color_cfg):
         if not color_cfg or not color_cfg.get("enabled", True):
             return
 
-        panel = Image.new("RGBA", self.canvas_size, (0, 0, 0, 0))
-        draw = ImageDraw.Draw(panel)
         radius = color_cfg.get("border_radius", 0)
         margin = color_cfg.get("margin", 0)
         color = tuple(color_cfg["color"])
@@ -300,10 +792,20 @@ class CardGenerator:
         if opacity <= 1:
             opacity = int(opacity * 255)
         fill = (*color, opacity)
-        
-        box = (margin, margin, self.canvas_size[0] - margin, self.canvas_size[1] - margin)
-        draw.rounded_rectangle(box, radius=radius, fill=fill)
-        canvas.alpha_composite(panel)
+
+        # The panel only spans the overlay box and is reused across renders.
+        width = self.canvas_size[0] - 2 * margin + 1
+        height = self.canvas_size[1] - 2 * margin + 1
+        if width <= 0 or height <= 0:
+            return
+        cache_key = (width, height, radius, fill)
+        panel = self.overlay_cache.get(cache_key)
+        if panel is None:
+            panel = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+            ImageDraw.Draw(panel).rounded_rectangle((0, 0, width - 1, height - 1), radius=radius, fill=fill)
+            with self._lock:
+                self.overlay_cache[cache_key] = panel
+        canvas.alpha_composite(panel, (margin, margin))
 
     def _fit_text(self, draw, text, font_config, max_width, max_lines):
         size = font_config["size"]
@@ -311,16 +813,16 @@ class CardGenerator:
         
         while size >= min_size:
             font = self._get_font(font_config, size)
-            lines = self._wrap_text(draw, text, font, max_width, max_lines)
+            lines = self._wrap_text(draw, text, font, font_config, max_width, max_lines)
             if self._all_words_fit(text, lines):
                 return font, lines
             size -= 2
         
         # Final fallback to min size
         font = self._get_font(font_config, min_size)
-        return font, self._wrap_text(draw, text, font, max_width, max_lines)
+        return font, self._wrap_text(draw, text, font, font_config, max_width, max_lines)
 
-    def _wrap_text(self, draw, text, font, max_width, max_lines):
+    def _wrap_text(self, draw, text, font, font_config, max_width, max_lines):
         # Respect existing newlines first
         input_lines = text.split('\n')
         final_lines = []
@@ -330,8 +832,7 @@ class CardGenerator:
             current = ""
             for word in words:
                 test = f"{current} {word}".strip()
-                bbox = draw.textbbox((0, 0), test, font=font)
-                if (bbox[2] - bbox[0]) <= max_width:
+                if self._text_width(draw, test, font, font_config) <= max_width:
                     current = test
                 else:
                     if current: final_lines.append(current)
@@ -351,8 +852,11 @@ class CardGenerator:
     def render(self, data, runtime_images=None):
         """Generate the final card image from character data."""
         template_role = self._template_role_for(data)
-        layout = self._resolved_layout(template_role)
-        card = self._create_base_canvas(layout, template_role, runtime_images=runtime_images)
+        layout = self._layout_for(template_role)
+        if runtime_images:
+            card = self._create_base_canvas(layout, template_role, runtime_images=runtime_images)
+        else:
+            card = self._base_canvas(template_role).copy()
         draw = ImageDraw.Draw(card)
         fonts = layout["fonts"]
 
@@ -365,11 +869,121 @@ class CardGenerator:
                 faceclaim = self._prepare_avatar(faceclaim, av_cfg)
                 card.alpha_composite(faceclaim, (av_cfg["x"], av_cfg["y"]))
 
-        self._render_text_elements(draw, dict(data), layout)
+        self._render_text_elements(card, draw, dict(data), layout)
 
         return card
 
-    def _render_text_elements(self, draw, data, layout):
+    def render_animated(self, data, runtime_images=None):
+        """
+        Render a card with an animated faceclaim as APNG bytes.
+
+        Returns None when the faceclaim is missing or static. The base layers and
+        text are composited once; each frame only redraws the avatar region.
+        """
+        avatar_path = data.get("avatar_path")
+        if not avatar_path:
+            return None
+        path = Path(avatar_path)
+        if not path.is_absolute():
+            path = Defaults.FACECLAIMS_DIR / path
+        if not path.exists():
+            return None
+
+        with Image.open(path) as source:
+            if not getattr(source, "is_animated", False):
+                return None
+            template_role = self._template_role_for(data)
+            layout = self._layout_for(template_role)
+            if runtime_images:
+                base = self._create_base_canvas(layout, template_role, runtime_images=runtime_images)
+            else:
+                base = self._base_canvas(template_role)
+            text_layer = Image.new("RGBA", self.canvas_size, (0, 0, 0, 0))
+            self._render_text_elements(text_layer, ImageDraw.Draw(text_layer), dict(data), layout)
+
+            av_cfg = layout["avatar"]
+            x, y = av_cfg["x"], av_cfg["y"]
+            width, height = self._avatar_size(av_cfg)
+            box = (max(0, x), max(0, y), min(self.canvas_size[0], x + width), min(self.canvas_size[1], y + height))
+            region_base = base.crop(box)
+            region_text = text_layer.crop(box)
+
+            regions = []
+            for index, frame in enumerate(ImageSequence.Iterator(source)):
+                if index >= Defaults.ANIMATION_MAX_FRAMES:
+                    break
+                region = region_base.copy()
+                region.alpha_composite(self._prepare_avatar(frame.convert("RGBA"), av_cfg), (0, 0), (box[0] - x, box[1] - y))
+                region.alpha_composite(region_text)
+                regions.append((region, frame.info.get("duration") or Defaults.ANIMATION_DEFAULT_FRAME_MS))
+            loop = source.info.get("loop", 0)
+
+        first = base.copy()
+        first.alpha_composite(text_layer)
+        first.paste(regions[0][0], box[:2])
+        return encode_apng(first, regions, box[:2], loop)
+
+    def _text_sprite(self, text, font, font_config, anchor):
+        chain = self._font_chain(font_config)
+        key = (text, chain, font.size, font_config.get("weight"), tuple(font_config["color"]), anchor)
+
+        def build():
+            runs = self._font_runs(text, font, font_config)
+            if len(runs) > 1:
+                return self._build_mixed_sprite(runs, font_config["color"], anchor)
+            run_font = runs[0][1]
+            left, top, right, bottom = run_font.getbbox(text, anchor=anchor)
+            if right <= left or bottom <= top:
+                return None, (0, 0)
+            sprite = Image.new("RGBA", (right - left, bottom - top), (0, 0, 0, 0))
+            ImageDraw.Draw(sprite).text((-left, -top), text, font=run_font, fill=font_config["color"], anchor=anchor)
+            return sprite, (left, top)
+
+        return text_sprite_cache.get(key, build)
+
+    def _build_mixed_sprite(self, runs, color, anchor):
+        # Runs from different fonts share one baseline and are laid out by advance
+        # width; the anchor is then resolved against the combined line, using the
+        # tallest ascent and deepest descent for the vertical anchors.
+        placed = []
+        cursor = 0.0
+        for run, run_font in runs:
+            placed.append((cursor, run, run_font, run_font.getbbox(run, anchor="ls")))
+            cursor += run_font.getlength(run)
+        left = min(int(x) + bbox[0] for x, _, _, bbox in placed)
+        top = min(bbox[1] for _, _, _, bbox in placed)
+        right = max(int(x) + bbox[2] for x, _, _, bbox in placed)
+        bottom = max(bbox[3] for _, _, _, bbox in placed)
+        if right <= left or bottom <= top:
+            return None, (0, 0)
+
+        sprite = Image.new("RGBA", (right - left, bottom - top), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(sprite)
+        for x, run, run_font, _ in placed:
+            draw.text((int(x) - left, -top), run, font=run_font, fill=color, anchor="ls")
+
+        ascent = max(run_font.getmetrics()[0] for _, run_font in runs)
+        descent = max(run_font.getmetrics()[1] for _, run_font in runs)
+        anchor_x = {"l": 0, "m": cursor / 2, "r": cursor}.get(anchor[0], 0)
+        anchor_y = {"a": -ascent, "t": top, "m": (descent - ascent) / 2, "s": 0, "b": bottom, "d": descent}.get(anchor[1], 0)
+        return sprite, (left - round(anchor_x), top - round(anchor_y))
+
+    def _draw_text(self, card, xy, text, font, font_config, anchor):
+        if "\n" in text:
+            ImageDraw.Draw(card).text(xy, text, font=font, fill=font_config["color"], anchor=anchor)
+            return
+        sprite, (left, top) = self._text_sprite(text, font, font_config, anchor)
+        if sprite is None:
+            return
+        dest_x, dest_y = xy[0] + left, xy[1] + top
+        # alpha_composite only accepts non-negative destinations, so clip the
+        # sprite instead when text hangs off the top or left edge.
+        crop_x, crop_y = max(0, -dest_x), max(0, -dest_y)
+        if crop_x >= sprite.width or crop_y >= sprite.height:
+            return
+        card.alpha_composite(sprite, (dest_x + crop_x, dest_y + crop_y), (crop_x, crop_y))
+
+    def _render_text_elements(self, card, draw, data, layout):
         fonts = layout["fonts"]
         for element_id, cfg in layout.get("text", {}).items():
             field = cfg.get("field", element_id)
@@ -393,21 +1007,9 @@ class CardGenerator:
                 font, lines = self._fit_text(draw, text, font_config, max_width, max_lines)
                 line_height = cfg.get("line_height", font_config["size"])
                 for i, line in enumerate(lines):
-                    draw.text(
-                        (x, y + i * line_height),
-                        line,
-                        font=font,
-                        fill=font_config["color"],
-                        anchor=anchor
-                    )
+                    self._draw_text(card, (x, y + i * line_height), line, font, font_config, anchor)
             else:
-                draw.text(
-                    (x, y),
-                    text,
-                    font=self._get_font(font_config),
-                    fill=font_config["color"],
-                    anchor=anchor
-                )
+                self._draw_text(card, (x, y), text, self._get_font(font_config), font_config, anchor)
 
 def iter_mongo_character_items(mongo_uri, database, collection, status="active"):
     """Yield character data from MongoDB."""
@@ -450,6 +1052,12 @@ def default_output_filename(char_data, fallback_name):
 
 
 if __name__ == "__main__":
+    if not __package__:
+        # Allow `python card.py` from inside cogs_cardmaker/ as well as `python -m`.
+        sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from cogs_cardmaker.render_cache import RenderCache
+    from cogs_cardmaker.service import render_many
+
     parser = argparse.ArgumentParser(description="Professional Character Card Generator")
     parser.add_argument("-l", "--layout", default="default-rotw", help="Design name, design folder, or config.json path")
     parser.add_argument("-b", "--batch", action="store_true", help="Render characters from MongoDB")
@@ -457,6 +1065,8 @@ if __name__ == "__main__":
     parser.add_argument("--database", default=Defaults.MONGO_DATABASE, help="MongoDB database name for --batch.")
     parser.add_argument("--collection", default=Defaults.MONGO_CHARACTER_COLLECTION, help="MongoDB collection name for --batch.")
     parser.add_argument("--status", default="active", help="MongoDB admin.status filter for --batch. Use 'all' for no filter.")
+    parser.add_argument("--no-cache", action="store_true", help="Re-render even when outputs/ already holds this exact card.")
+    parser.add_argument("--cache-max-mb", type=int, default=Defaults.OUTPUT_CACHE_MAX_BYTES // (1024 * 1024), help="Size cap for the outputs/ render cache in MB.")
     
     # Character Data Overrides
     group = parser.add_argument_group("character overrides")
@@ -472,12 +1082,13 @@ if __name__ == "__main__":
     group.add_argument("--affiliation", help="Compatibility alias for Master affiliation or Servant class")
     group.add_argument("--occupation", help="Compatibility alias for Master occupation or Servant nationality")
     group.add_argument("--footer", help="Footer text")
-    group.add_argument("--output", help="Custom output filename")
+    group.add_argument("--output", help="Also copy the rendered card to this path")
 
     args = parser.parse_args()
 
     try:
         gen = CardGenerator(args.layout)
+        cache = RenderCache(Defaults.OUTPUT_DIR, args.cache_max_mb * 1024 * 1024)
         mongo_uri = args.mongo_uri or os.environ.get("MONGODB_URI")
 
         # Determine character data to process.
@@ -503,7 +1114,8 @@ if __name__ == "__main__":
         if args.output and len(expanded_items) > 1:
             parser.error("--output can only be used when rendering one card.")
 
-        for char_data, char_name_from_file in expanded_items:
+        prepared = []
+        for char_data, _ in expanded_items:
             template_role = gen._template_role_for(char_data)
             if args.master_affiliation:
                 char_data["affiliation"] = args.master_affiliation
@@ -532,15 +1144,28 @@ if __name__ == "__main__":
                         char_data["avatar_path"] = faceclaim
                         break
 
-            # Finalize character data
-            output_filename = args.output if args.output else default_output_filename(char_data, char_name_from_file)
-            output_path = Defaults.OUTPUT_DIR / output_filename
-            
-            print(f"Rendering: {char_data.get('name', 'Unknown')} -> {output_path}")
-            card_img = gen.render(char_data)
-            card_img.save(output_path)
+            prepared.append(char_data)
+
+        # Cards are grouped by template role and rendered across worker threads;
+        # results still arrive in input order.
+        failed = 0
+        for result in render_many(prepared, args.layout, cache=cache, use_cache=not args.no_cache):
+            char_data = result.character
+            if result.error:
+                failed += 1
+                print(f"Failed: {char_data.get('name', 'Unknown')}: {result.error}")
+                continue
+            output_path = cache.path_for(result.fingerprint)
+            label = "Cached" if result.cached else "Rendering"
+            print(f"{label}: {char_data.get('name', 'Unknown')} -> {output_path}")
+            if args.output:
+                shutil.copyfile(output_path, args.output)
+                print(f"Copied to {args.output}")
             processed += 1
 
+        if failed:
+            print(f"\nProcessed {processed} card(s); {failed} failed.")
+            sys.exit(1)
         print(f"\nSuccess! Processed {processed} card(s).")
 
     except Exception as e:
@@ -0,0 +1,163 @@
+"""
+Lost-update check for the character repo's post updates.
+
+Runs posting, unlinking, resource-message updates and field edits on one
+character concurrently against a scratch database, then checks that every write
+is present in the final document. Needs a real MongoDB server:
+
+    python -m cogs_cardmaker.concurrency_check --guilds 16 --rounds 5
+
+The scratch database is dropped afterwards unless --keep is given.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Any
+
+from dotenv import load_dotenv
+
+from cogs_cardmaker.repo import SCHEMA_VERSION, CardmakerRepo
+from services.audit_writer import close_default_audit_writer
+from services.mongo import close_async_clients, close_clients, get_async_client, get_client
+
+
+DEFAULT_DATABASE = "cardmaker-concurrency-check"
+CHARACTER_ID = "concurrency-check"
+
+
+def _character() -> dict[str, Any]:
+    return {
+        "_id": CHARACTER_ID,
+        "name": "Concurrency Check",
+        "schema_version": SCHEMA_VERSION,
+        "discord": {"posts": []},
+        "admin": {"status": "active"},
+    }
+
+
+def _thread_id(guild_id: int) -> int:
+    return guild_id * 1000 + 1
+
+
+async def _post(repo: CardmakerRepo, guild_id: int) -> None:
+    await repo.mark_posted(
+        CHARACTER_ID,
+        guild_id=guild_id,
+        forum_channel_id=guild_id * 10,
+        thread_id=_thread_id(guild_id),
+        starter_message_id=guild_id * 1000 + 2,
+        resource_message_id=None,
+        actor_id="concurrency-check",
+    )
+
+
+async def run_round(repo: CardmakerRepo, guilds: int, round_index: int) -> list[str]:
+    await repo.characters.replace_one({"_id": CHARACTER_ID}, _character(), upsert=True)
+    repo.cache.forget(CHARACTER_ID)
+
+    first = list(range(1, guilds + 1))
+    second = list(range(guilds + 1, 2 * guilds + 1))
+    await asyncio.gather(*(_post(repo, guild_id) for guild_id in first))
+
+    kept, unlinked = first[::2], first[1::2]
+    await asyncio.gather(
+        *(
+            repo.set_resource_message_id(
+                CHARACTER_ID,
+                thread_id=_thread_id(guild_id),
+                resource_message_id=guild_id * 1000 + 3,
+                actor_id="concurrency-check",
+            )
+            for guild_id in kept
+        ),
+        *(
+            repo.remove_post_for_guild(CHARACTER_ID, guild_id=guild_id, thread_id=_thread_id(guild_id), actor_id="concurrency-check")
+            for guild_id in unlinked
+        ),
+        *(_post(repo, guild_id) for guild_id in second),
+        *(
+            repo.update_fields(CHARACTER_ID, {f"check.field_{index}": round_index}, "concurrency-check", "concurrency_check")
+            for index in range(guilds)
+        ),
+    )
+
+    doc = await repo.characters.find_one({"_id": CHARACTER_ID})
+    posts = (doc.get("discord") or {}).get("posts") or []
+    by_guild: dict[str, list[dict[str, Any]]] = {}
+    for post in posts:
+        by_guild.setdefault(str(post.get("guild_id")), []).append(post)
+
+    problems = []
+    for guild_id in kept + second:
+        found = by_guild.get(str(guild_id), [])
+        if len(found) != 1:
+            problems.append(f"guild {guild_id}: expected one post, found {len(found)}")
+    for guild_id in kept:
+        found = by_guild.get(str(guild_id), [])
+        if found and found[0].get("resource_message_id") != str(guild_id * 1000 + 3):
+            problems.append(f"guild {guild_id}: resource message id lost")
+    for guild_id in unlinked:
+        if str(guild_id) in by_guild:
+            problems.append(f"guild {guild_id}: post was not removed")
+    fields = doc.get("check") or {}
+    for index in range(guilds):
+        if fields.get(f"field_{index}") != round_index:
+            problems.append(f"check.field_{index}: update lost")
+    return problems
+
+
+async def check(args: argparse.Namespace, db, sync_db) -> int:
+    """Run the rounds; `db` is an AsyncMongoClient database and `sync_db` the same database."""
+    repo = CardmakerRepo(db, sync_db)
+    await repo.ensure_indexes()
+    failures = 0
+    started = time.perf_counter()
+    for round_index in range(args.rounds):
+        problems = await run_round(repo, args.guilds, round_index)
+        failures += bool(problems)
+        for problem in problems:
+            print(f"Round {round_index + 1}: {problem}")
+    elapsed = time.perf_counter() - started
+    print(f"{args.rounds - failures}/{args.rounds} round(s) without lost updates ({elapsed:.2f} s).")
+    return 1 if failures else 0
+
+
+async def _check_with_client(args: argparse.Namespace, mongo_uri: str, sync_db) -> int:
+    try:
+        return await check(args, get_async_client(mongo_uri)[args.database], sync_db)
+    finally:
+        await close_async_clients()
+
+
+def run(args: argparse.Namespace) -> int:
+    load_dotenv()
+    mongo_uri = args.mongo_uri or os.getenv("MONGODB_URI")
+    if not mongo_uri:
+        raise RuntimeError("Provide --mongo-uri or set MONGODB_URI.")
+
+    client = get_client(mongo_uri)
+    try:
+        return asyncio.run(_check_with_client(args, mongo_uri, client[args.database]))
+    finally:
+        close_default_audit_writer()
+        if not args.keep:
+            client.drop_database(args.database)
+        close_clients()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Check concurrent card post updates for lost writes.")
+    parser.add_argument("--mongo-uri", help="MongoDB connection string. Defaults to MONGODB_URI.")
+    parser.add_argument("--database", default=DEFAULT_DATABASE, help="Scratch database to use. It is dropped afterwards.")
+    parser.add_argument("--guilds", type=int, default=16, help="Guilds posted to per round.")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds to run.")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch database for inspection.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    raise SystemExit(run(parse_args()))
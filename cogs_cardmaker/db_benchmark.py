@@ -0,0 +1,175 @@
+"""
+MongoDB client benchmark for the bot's data layer.
+
+Compares the native AsyncMongoClient with the previous approach of running the
+synchronous MongoClient through asyncio.to_thread. Concurrent tasks issue
+character lookups by id and field updates against a scratch database, and each
+run reports throughput and per-operation latency percentiles. Needs a real
+MongoDB server:
+
+    python -m cogs_cardmaker.db_benchmark --concurrency 1 8 32 128
+    python -m cogs_cardmaker.db_benchmark --operations 5000 --write-ratio 0.5 --json
+
+The scratch database is dropped afterwards unless --keep is given.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+from typing import Any, Awaitable, Callable
+
+from dotenv import load_dotenv
+
+from services.mongo import close_async_clients, close_clients, get_async_client, get_client, pool_stats
+
+
+DEFAULT_DATABASE = "cardmaker-db-benchmark"
+COLLECTION = "cardmaker_characters"
+MODES = ("thread", "async")
+
+
+def _character(index: int) -> dict[str, Any]:
+    return {
+        "_id": f"benchmark-{index}",
+        "name": f"Benchmark Character {index}",
+        "safe_name": f"benchmark-character-{index}",
+        "role": "Master",
+        "discord": {"posts": [{"guild_id": "1", "thread_id": str(index + 1000)}]},
+        "admin": {"status": "active"},
+    }
+
+
+def seed(db, documents: int) -> None:
+    collection = db[COLLECTION]
+    collection.delete_many({})
+    collection.insert_many([_character(index) for index in range(documents)])
+
+
+def _operation(collection, character_id: str, write: bool, step: int, offload: bool) -> Callable[[], Awaitable[Any]]:
+    if write:
+        args = ({"_id": character_id}, {"$set": {"benchmark.step": step}})
+        method = collection.update_one
+    else:
+        args = ({"_id": character_id},)
+        method = collection.find_one
+    if offload:
+        return lambda: asyncio.to_thread(method, *args)
+    return lambda: method(*args)
+
+
+async def run_load(collection, *, offload: bool, concurrency: int, operations: int, documents: int, write_ratio: float) -> dict[str, Any]:
+    """Run `operations` requests over `concurrency` tasks and time each one."""
+    latencies: list[float] = []
+    rng = random.Random(concurrency)
+    plan = [(f"benchmark-{rng.randrange(documents)}", rng.random() < write_ratio) for _ in range(operations)]
+
+    async def worker(start: int) -> None:
+        for step in range(start, operations, concurrency):
+            character_id, write = plan[step]
+            call = _operation(collection, character_id, write, step, offload)
+            began = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - began)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(start) for start in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "mode": "thread" if offload else "async",
+        "concurrency": concurrency,
+        "operations": operations,
+        "ops_per_second": operations / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "p50_ms": percentiles[49] * 1000,
+        "p95_ms": percentiles[94] * 1000,
+        "p99_ms": percentiles[98] * 1000,
+        "max_ms": latencies[-1] * 1000,
+    }
+
+
+async def _benchmark_async(args: argparse.Namespace, mongo_uri: str, sync_db) -> list[dict[str, Any]]:
+    try:
+        collections = {"thread": sync_db[COLLECTION], "async": get_async_client(mongo_uri)[args.database][COLLECTION]}
+        # One untimed round per mode opens its pool connections before measuring.
+        for mode in args.modes:
+            await run_load(collections[mode], offload=mode == "thread", concurrency=max(args.concurrency), operations=max(args.concurrency), documents=args.documents, write_ratio=0.0)
+        results = []
+        for concurrency in args.concurrency:
+            for mode in args.modes:
+                results.append(await run_load(
+                    collections[mode],
+                    offload=mode == "thread",
+                    concurrency=concurrency,
+                    operations=args.operations,
+                    documents=args.documents,
+                    write_ratio=args.write_ratio,
+                ))
+        return results
+    finally:
+        await close_async_clients()
+
+
+def run(args: argparse.Namespace) -> int:
+    load_dotenv()
+    mongo_uri = args.mongo_uri or os.getenv("MONGODB_URI")
+    if not mongo_uri:
+        raise RuntimeError("Provide --mongo-uri or set MONGODB_URI.")
+
+    client = get_client(mongo_uri)
+    try:
+        seed(client[args.database], args.documents)
+        results = asyncio.run(_benchmark_async(args, mongo_uri, client[args.database]))
+    finally:
+        if not args.keep:
+            client.drop_database(args.database)
+        close_clients()
+
+    pools = pool_stats()
+    if args.json:
+        print(json.dumps({"runs": results, "pools": {"thread": pools["sync"], "async": pools["async"]}}, indent=2))
+        return 0
+
+    print(f"{args.operations} operation(s) per run, {args.write_ratio:.0%} writes, {args.documents} document(s)")
+    print(f"{'mode':<8}{'tasks':>7}{'ops/s':>10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for result in results:
+        print(
+            f"{result['mode']:<8}{result['concurrency']:>7}{result['ops_per_second']:>10.0f}{result['mean_ms']:>10.2f}"
+            f"{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['max_ms']:>10.2f}"
+        )
+    for mode, kind in (("thread", "sync"), ("async", "async")):
+        if mode in args.modes:
+            pool = pools[kind]
+            print(
+                f"{mode} pool: peak {pool['peak_in_use']} in use, {pool['open']} open, checkout wait "
+                f"avg {pool['wait_avg_ms']:.2f} ms / p95 {pool['wait_p95_ms']:.2f} ms / max {pool['wait_max_ms']:.2f} ms"
+            )
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare AsyncMongoClient with MongoClient in asyncio.to_thread under concurrent load.")
+    parser.add_argument("--mongo-uri", help="MongoDB connection string. Defaults to MONGODB_URI.")
+    parser.add_argument("--database", default=DEFAULT_DATABASE, help="Scratch database to use. It is dropped afterwards.")
+    parser.add_argument("--mode", dest="modes", choices=MODES, action="append", help="Client to measure. Repeatable; defaults to both.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128], help="Concurrent tasks per run.")
+    parser.add_argument("--operations", type=int, default=2000, help="Operations per run.")
+    parser.add_argument("--documents", type=int, default=1000, help="Characters seeded into the scratch collection.")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="Share of operations that are updates rather than lookups.")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch database for inspection.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args()
+    args.modes = args.modes or list(MODES)
+    return args
+
+
+if __name__ == "__main__":
+    raise SystemExit(run(parse_args()))
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable
+
+
+POLL_SECONDS = 2.0
+DEBOUNCE_SECONDS = 0.5
+
+# From <sys/inotify.h>.
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+
+class _InotifyBackend:
+    name = "inotify"
+
+    def __init__(self, roots: list[Path]):
+        self._roots = roots
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: dict[int, Path] = {}
+        for root in roots:
+            self._watch_tree(root)
+
+    def _watch_tree(self, root: Path) -> None:
+        for dirpath, _, _ in os.walk(root):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd >= 0:
+                self._dirs[wd] = Path(dirpath)
+
+    def wait(self, timeout: float) -> set[Path]:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed: set[Path] = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+            offset += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped, so report the roots and let the caller start over.
+                changed.update(self._roots)
+                continue
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            path = directory / os.fsdecode(name) if name else directory
+            changed.add(path)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self._watch_tree(path)
+                changed.update(child for child in path.rglob("*") if child.is_file())
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class _PollingBackend:
+    name = "polling"
+
+    def __init__(self, roots: list[Path]):
+        self._roots = roots
+        self._snapshot = self._scan()
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        snapshot = {}
+        for root in self._roots:
+            for dirpath, _, filenames in os.walk(root):
+                for filename in filenames:
+                    path = Path(dirpath) / filename
+                    try:
+                        stat = path.stat()
+                    except FileNotFoundError:
+                        continue
+                    snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait(self, timeout: float) -> set[Path]:
+        time.sleep(timeout)
+        current = self._scan()
+        changed = {path for path in current.keys() | self._snapshot.keys() if current.get(path) != self._snapshot.get(path)}
+        self._snapshot = current
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+class DesignWatcher:
+    """
+    Background thread that reports changed files under the design and font folders.
+
+    Uses inotify on Linux and falls back to polling file stats elsewhere. Changes are
+    collected until the folders have been quiet for `debounce` seconds, since editors
+    and copies often write one file in several steps, then passed to `on_change` as
+    one batch of absolute paths. A root in the batch means events were lost.
+    """
+
+    def __init__(
+        self,
+        roots: Iterable[Path],
+        on_change: Callable[[set[Path]], None],
+        poll_seconds: float = POLL_SECONDS,
+        debounce: float = DEBOUNCE_SECONDS,
+    ):
+        self.roots = [Path(root).resolve() for root in roots]
+        self.on_change = on_change
+        self.poll_seconds = poll_seconds
+        self.debounce = debounce
+        self.backend_name: str | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _open_backend(self):
+        if sys.platform.startswith("linux"):
+            try:
+                return _InotifyBackend(self.roots)
+            except (OSError, AttributeError):
+                pass
+        return _PollingBackend(self.roots)
+
+    def start(self) -> None:
+        for root in self.roots:
+            root.mkdir(parents=True, exist_ok=True)
+        backend = self._open_backend()
+        self.backend_name = backend.name
+        self._thread = threading.Thread(target=self._run, args=(backend,), name="cardmaker-design-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self, backend) -> None:
+        pending: set[Path] = set()
+        try:
+            while not self._stop.is_set():
+                changed = backend.wait(self.debounce if pending else self.poll_seconds)
+                if changed:
+                    pending |= changed
+                    continue
+                if pending:
+                    batch, pending = pending, set()
+                    try:
+                        self.on_change(batch)
+                    except Exception as exc:
+                        print(f"Design reload failed: {exc}")
+        finally:
+            backend.close()
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dotenv import load_dotenv
+from pymongo.database import Database
+
+from cogs_cardmaker.card import Defaults
+from cogs_cardmaker.render_cache import default_render_cache
+from services.mongo import get_database
+
+
+DEFAULT_DATABASE = "grail-kun"
+CHARACTER_COLLECTION = "cardmaker_characters"
+DELETED_COLLECTION = "cardmaker_deleted"
+AUDIT_COLLECTION = "cardmaker_audit"
+# An upload is written to faceclaims/ before its avatar_path is saved, so very
+# new files are left alone rather than racing an in-progress upload.
+MIN_AGE_SECONDS = 60 * 60
+MANIFEST_FILENAME = "manifest.json"
+
+
+@dataclass
+class FaceclaimGcReport:
+    scanned: int = 0
+    referenced: int = 0
+    orphans: list[tuple[str, int]] = field(default_factory=list)
+    skipped_recent: int = 0
+    quarantine_dir: Path | None = None
+    renders_dropped: int = 0
+
+    @property
+    def reclaimed_bytes(self) -> int:
+        return sum(size for _, size in self.orphans)
+
+
+def _reference_key(avatar_path: str) -> Path:
+    path = Path(avatar_path)
+    if not path.is_absolute():
+        path = Defaults.FACECLAIMS_DIR / path
+    return path.resolve()
+
+
+def referenced_faceclaims(db: Database) -> set[Path]:
+    """Every faceclaim file named by a live or deleted character, from one aggregation."""
+    has_avatar = {"$match": {"avatar_path": {"$nin": [None, ""]}}}
+    pipeline = [
+        has_avatar,
+        {"$project": {"_id": 0, "avatar_path": 1}},
+        # Deleted cards keep their faceclaim so they can be restored.
+        {"$unionWith": {"coll": DELETED_COLLECTION, "pipeline": [has_avatar, {"$project": {"_id": 0, "avatar_path": 1}}]}},
+        {"$group": {"_id": "$avatar_path"}},
+    ]
+    return {_reference_key(str(doc["_id"])) for doc in db[CHARACTER_COLLECTION].aggregate(pipeline)}
+
+
+def find_orphans(db: Database, min_age_seconds: float = MIN_AGE_SECONDS) -> FaceclaimGcReport:
+    referenced = referenced_faceclaims(db)
+    report = FaceclaimGcReport(referenced=len(referenced))
+    directory = Defaults.FACECLAIMS_DIR.resolve()
+    cutoff = time.time() - min_age_seconds
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.startswith(".") or not entry.is_file():
+                continue
+            report.scanned += 1
+            if directory / entry.name in referenced:
+                continue
+            stat = entry.stat()
+            if stat.st_mtime > cutoff:
+                report.skipped_recent += 1
+                continue
+            report.orphans.append((entry.name, stat.st_size))
+    report.orphans.sort()
+    return report
+
+
+def quarantine_orphans(db: Database, report: FaceclaimGcReport, actor_id: int | str | None = "system") -> FaceclaimGcReport:
+    """
+    Move the report's orphans into a timestamped folder under faceclaims_quarantine/.
+
+    The folder's manifest.json lists what was moved, so files can be restored by
+    moving them back. Cached renders made from the moved files are dropped.
+    """
+    if not report.orphans:
+        return report
+    now = datetime.now(timezone.utc)
+    target = Defaults.FACECLAIM_QUARANTINE_DIR / now.strftime("%Y%m%d_%H%M%S")
+    target.mkdir(parents=True, exist_ok=True)
+
+    moved = []
+    for name, size in report.orphans:
+        source = Defaults.FACECLAIMS_DIR / name
+        try:
+            shutil.move(source, target / name)
+        except FileNotFoundError:
+            continue
+        moved.append((name, size))
+    report.orphans = moved
+    report.quarantine_dir = target
+
+    (target / MANIFEST_FILENAME).write_text(json.dumps({
+        "created_at": now.isoformat(),
+        "source": str(Defaults.FACECLAIMS_DIR),
+        "files": [{"name": name, "size": size} for name, size in moved],
+    }, indent=1), encoding="utf-8")
+    report.renders_dropped = default_render_cache().discard_avatars({name for name, _ in moved})
+
+    db[AUDIT_COLLECTION].insert_one({
+        "character_id": None,
+        "actor_id": str(actor_id) if actor_id is not None else None,
+        "kind": "faceclaims_quarantined",
+        "details": {
+            "quarantine_dir": str(target),
+            "files": len(moved),
+            "reclaimed_bytes": report.reclaimed_bytes,
+            "renders_dropped": report.renders_dropped,
+        },
+        "created_at": now,
+    })
+    return report
+
+
+def collect_garbage(
+    db: Database,
+    *,
+    apply: bool = False,
+    min_age_seconds: float = MIN_AGE_SECONDS,
+    actor_id: int | str | None = "system",
+) -> FaceclaimGcReport:
+    report = find_orphans(db, min_age_seconds)
+    return quarantine_orphans(db, report, actor_id) if apply else report
+
+
+def format_bytes(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f} MB" if size >= 1024 * 1024 else f"{size / 1024:.1f} KB"
+
+
+def run(args: argparse.Namespace) -> int:
+    load_dotenv()
+    mongo_uri = args.mongo_uri or os.getenv("MONGODB_URI")
+    if not mongo_uri:
+        raise RuntimeError("Provide --mongo-uri or set MONGODB_URI.")
+
+    db = get_database(args.database, mongo_uri)
+    report = collect_garbage(db, apply=args.apply, min_age_seconds=args.min_age_hours * 3600)
+
+    print(f"Faceclaim files scanned: {report.scanned}")
+    print(f"Referenced faceclaims: {report.referenced}")
+    print(f"Skipped as too recent: {report.skipped_recent}")
+    print(f"Unreferenced files: {len(report.orphans)} ({format_bytes(report.reclaimed_bytes)})")
+    if not args.apply:
+        for name, size in report.orphans[:20]:
+            print(f"  {name} ({format_bytes(size)})")
+        if len(report.orphans) > 20:
+            print(f"  ... {len(report.orphans) - 20} more")
+        if report.orphans:
+            print("Run again with --apply to move them into quarantine.")
+        return 0
+    if report.quarantine_dir:
+        print(f"Moved to {report.quarantine_dir}; reclaimed {format_bytes(report.reclaimed_bytes)}.")
+        print(f"Cached renders dropped: {report.renders_dropped}")
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Quarantine faceclaim files no character references.")
+    parser.add_argument("--mongo-uri", help="MongoDB connection string. Defaults to MONGODB_URI.")
+    parser.add_argument("--database", default=DEFAULT_DATABASE, help="MongoDB database name.")
+    parser.add_argument("--min-age-hours", type=float, default=MIN_AGE_SECONDS / 3600, help="Ignore files modified more recently than this.")
+    parser.add_argument("--apply", action="store_true", help="Move unreferenced files into quarantine. Without it they are only listed.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    raise SystemExit(run(parse_args()))
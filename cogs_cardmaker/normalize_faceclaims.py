@@ -9,9 +9,9 @@ from pathlib import Path
 from typing import Any
 
 from dotenv import load_dotenv
-from pymongo import MongoClient
 
 from cogs_cardmaker.card import Defaults
+from services.mongo import get_client
 
 
 DEFAULT_DATABASE = "grail-kun"
@@ -32,7 +32,7 @@ def normalize(args: argparse.Namespace) -> int:
     if not mongo_uri:
         raise RuntimeError("Provide --mongo-uri or set MONGODB_URI.")
 
-    client = MongoClient(mongo_uri)
+    client = get_client(mongo_uri)
     db = client[args.database]
     characters = db[CHARACTER_COLLECTION]
     audit = db[AUDIT_COLLECTION]
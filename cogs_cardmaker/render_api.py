@@ -0,0 +1,207 @@
+"""
+HTTP render API for card previews.
+
+Serves `CardGenerator` renders of posted character JSON so tools such as the
+character-card-maker web app get output identical to the bot's. Run it inside
+the bot by setting CARDMAKER_RENDER_API_PORT, which shares the bot's warm
+generators and render scheduler, or as a sidecar:
+
+    python -m cogs_cardmaker.render_api --port 8765
+
+Responses carry an ETag derived from the render fingerprint and honour
+If-None-Match, so unchanged cards are revalidated without rendering.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hmac
+import io
+import json
+import os
+from typing import Any
+from urllib.parse import urlsplit
+
+from aiohttp import web
+from dotenv import load_dotenv
+from PIL import Image
+
+from cogs_cardmaker.card import Defaults, resample
+from cogs_cardmaker.render_scheduler import PRIORITY_INTERACTIVE, PRIORITY_SINGLE
+from cogs_cardmaker.service import render_card_bytes_async, render_fingerprint
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PREVIEW_WIDTH = 600
+MIN_PREVIEW_WIDTH = 64
+MAX_REQUEST_BYTES = 256 * 1024
+LOCAL_ORIGIN_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+
+def design_names() -> list[str]:
+    return sorted(path.parent.name for path in Defaults.DESIGNS_DIR.glob("*/config.json"))
+
+
+def _bad_request(message: str) -> web.HTTPBadRequest:
+    return web.HTTPBadRequest(text=json.dumps({"error": message}), content_type="application/json")
+
+
+def _character_from_payload(payload: Any) -> tuple[dict[str, Any], str]:
+    if not isinstance(payload, dict) or not isinstance(payload.get("character"), dict):
+        raise _bad_request("Body must be a JSON object with a 'character' object.")
+    character = dict(payload["character"])
+    # Without an id the render stays out of the per-character supersede map, so a
+    # preview cannot cancel the bot's render of the stored character.
+    character.pop("_id", None)
+    design = payload.get("design") or (character.get("card") or {}).get("default_design")
+    if not design:
+        raise _bad_request("A design is required.")
+    # Only installed designs by name; CardGenerator also accepts arbitrary paths.
+    if design not in design_names():
+        raise _bad_request(f"Unknown design '{design}'.")
+    avatar_path = character.get("avatar_path")
+    if avatar_path:
+        faceclaims = Defaults.FACECLAIMS_DIR.resolve()
+        resolved = (faceclaims / str(avatar_path)).resolve()
+        if faceclaims not in resolved.parents:
+            raise _bad_request("avatar_path must name a file in faceclaims/.")
+    return character, design
+
+
+def _etag(fingerprint: str, variant: str = "") -> str:
+    return f'"{fingerprint}{variant}"'
+
+
+def _not_modified(request: web.Request, etag: str) -> bool:
+    header = request.headers.get("If-None-Match", "")
+    return header.strip() == "*" or etag in {tag.strip() for tag in header.split(",")}
+
+
+def _png_response(data: bytes, etag: str) -> web.Response:
+    return web.Response(body=data, content_type="image/png", headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+def _preview_png(data: bytes, width: int) -> bytes:
+    with Image.open(io.BytesIO(data)) as image:
+        image = image.convert("RGBA")
+        if width < image.width:
+            image = resample(image, (width, max(1, round(image.height * width / image.width))))
+        buf = io.BytesIO()
+        image.save(buf, "PNG")
+        return buf.getvalue()
+
+
+async def _render(request: web.Request, priority: str, preview_width: int | None = None) -> web.Response:
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise _bad_request("Body must be valid JSON.")
+    character, design = _character_from_payload(payload)
+
+    fingerprint = await asyncio.to_thread(render_fingerprint, character, design)
+    etag = _etag(fingerprint, f"-w{preview_width}" if preview_width else "")
+    if _not_modified(request, etag):
+        return web.Response(status=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+    data = (await render_card_bytes_async(character, design, priority=priority)).getvalue()
+    if preview_width:
+        data = await asyncio.to_thread(_preview_png, data, preview_width)
+    return _png_response(data, etag)
+
+
+async def handle_render(request: web.Request) -> web.Response:
+    return await _render(request, PRIORITY_SINGLE)
+
+
+async def handle_preview(request: web.Request) -> web.Response:
+    try:
+        width = int(request.query.get("width", DEFAULT_PREVIEW_WIDTH))
+    except ValueError:
+        raise _bad_request("width must be an integer.")
+    return await _render(request, PRIORITY_INTERACTIVE, max(MIN_PREVIEW_WIDTH, width))
+
+
+async def handle_designs(request: web.Request) -> web.Response:
+    return web.json_response({"designs": design_names()})
+
+
+def _origin_allowed(origin: str | None, token: str | None) -> bool:
+    # Any origin may call the API once a token is required. Without one, only the
+    # web app opened from file:// ("null") or a localhost page may, so an
+    # arbitrary site in the user's browser cannot drive the local API.
+    if token or origin is None or origin == "null":
+        return True
+    try:
+        return urlsplit(origin).hostname in LOCAL_ORIGIN_HOSTS
+    except ValueError:
+        return False
+
+
+def _cors_headers(origin: str | None, token: str | None) -> dict[str, str]:
+    return {
+        "Access-Control-Allow-Origin": "*" if token else (origin or "null"),
+        "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
+        "Access-Control-Allow-Headers": "Authorization, Content-Type, If-None-Match",
+        "Access-Control-Expose-Headers": "ETag",
+        "Vary": "Origin",
+    }
+
+
+def create_app(token: str | None = None) -> web.Application:
+    @web.middleware
+    async def middleware(request: web.Request, handler):
+        origin = request.headers.get("Origin")
+        if not _origin_allowed(origin, token):
+            return web.json_response({"error": "Origin not allowed; set a token to serve other origins."}, status=403)
+        if request.method == "OPTIONS":
+            return web.Response(status=204, headers=_cors_headers(origin, token))
+        if token and not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+            response = web.json_response({"error": "Unauthorized."}, status=401)
+        else:
+            try:
+                response = await handler(request)
+            except web.HTTPException as exc:
+                response = exc
+            except (ValueError, FileNotFoundError) as exc:
+                response = web.json_response({"error": str(exc)}, status=400)
+        response.headers.update(_cors_headers(origin, token))
+        return response
+
+    app = web.Application(middlewares=[middleware], client_max_size=MAX_REQUEST_BYTES)
+    app.router.add_get("/designs", handle_designs)
+    app.router.add_post("/render", handle_render)
+    app.router.add_post("/preview", handle_preview)
+    return app
+
+
+async def start_render_api(host: str, port: int, token: str | None = None) -> web.AppRunner:
+    runner = web.AppRunner(create_app(token))
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+async def start_render_api_from_env() -> web.AppRunner | None:
+    """Start the API when CARDMAKER_RENDER_API_PORT is set; used by the cardmaker cog."""
+    port = os.getenv("CARDMAKER_RENDER_API_PORT")
+    if not port:
+        return None
+    host = os.getenv("CARDMAKER_RENDER_API_HOST", DEFAULT_HOST)
+    runner = await start_render_api(host, int(port), os.getenv("CARDMAKER_RENDER_API_TOKEN"))
+    print(f"Card render API listening on http://{host}:{port}")
+    return runner
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve card renders over HTTP.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Interface to bind. Defaults to {DEFAULT_HOST}.")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on.")
+    parser.add_argument("--token", help="Bearer token required on every request. Defaults to CARDMAKER_RENDER_API_TOKEN.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    args = parse_args()
+    web.run_app(create_app(args.token or os.getenv("CARDMAKER_RENDER_API_TOKEN")), host=args.host, port=args.port)
@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+from cogs_cardmaker.card import Defaults
+
+try:
+    import fcntl
+except ImportError:  # Windows: index writes are still merged, just not locked across processes.
+    fcntl = None
+
+
+INDEX_FILENAME = "index.json"
+INDEX_FLUSH_SECONDS = 30
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    # Write beside the target and rename over it so readers never see a partial file.
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+@contextmanager
+def _file_lock(path: Path) -> Iterator[None]:
+    if fcntl is None:
+        yield
+        return
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _unlink(paths: list[Path]) -> None:
+    for path in paths:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class RenderCache:
+    """
+    Size-capped on-disk cache of encoded card renders, keyed by render fingerprint.
+
+    `index.json` maps each fingerprint to its file, size and last access time, so
+    lookups never scan the directory. Entries are kept in access order and the
+    least recently used ones are evicted once the total size passes `max_bytes`.
+    Files in the directory that are not in the index are left alone.
+
+    The bot and the command-line tools share the directory, so the index is
+    written at most every `INDEX_FLUSH_SECONDS` and each write is merged with
+    the index on disk under a file lock instead of replacing it.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.index_path = self.directory / INDEX_FILENAME
+        self.lock_path = self.directory / f".{INDEX_FILENAME}.lock"
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._total_bytes = 0
+        # Fingerprints added or removed here since the last index write.
+        self._added: set[str] = set()
+        self._removed: set[str] = set()
+        self._dirty = False
+        self._last_flush = 0.0
+        self.hits = 0
+        self.misses = 0
+        self._load_index()
+        atexit.register(self.flush)
+
+    def _read_index(self) -> dict[str, dict[str, Any]] | None:
+        try:
+            raw = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+        return raw.get("entries") or {}
+
+    def _load_index(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entries = sorted((self._read_index() or {}).items(), key=lambda item: item[1].get("atime", 0))
+        for fingerprint, entry in entries:
+            if not (self.directory / entry["file"]).exists():
+                self._removed.add(fingerprint)
+                self._dirty = True
+                continue
+            self._entries[fingerprint] = entry
+            self._total_bytes += int(entry.get("size", 0))
+
+    def _flush_due_locked(self, force: bool = False) -> bool:
+        return self._dirty and (force or time.time() - self._last_flush >= INDEX_FLUSH_SECONDS)
+
+    def _merge(self, entries: dict[str, dict[str, Any]], added: set[str], removed: set[str]) -> tuple[OrderedDict[str, dict[str, Any]], dict[str, Path]]:
+        # Entries another process added are adopted, and entries it dropped are
+        # dropped here too unless this process added them since the last write.
+        on_disk = self._read_index()
+        if on_disk is None:
+            on_disk = entries
+        merged = {}
+        for fingerprint, entry in on_disk.items():
+            if fingerprint in removed:
+                continue
+            mine = entries.get(fingerprint)
+            if mine is not None and mine.get("atime", 0) >= entry.get("atime", 0):
+                entry = mine
+            merged[fingerprint] = entry
+        for fingerprint in added:
+            if fingerprint in entries:
+                merged[fingerprint] = entries[fingerprint]
+        ordered = OrderedDict(sorted(merged.items(), key=lambda item: item[1].get("atime", 0)))
+        total = sum(int(entry.get("size", 0)) for entry in ordered.values())
+        evicted = {}
+        while total > self.max_bytes and ordered:
+            fingerprint, entry = ordered.popitem(last=False)
+            total -= int(entry.get("size", 0))
+            evicted[fingerprint] = self.directory / entry["file"]
+        return ordered, evicted
+
+    def _flush(self, force: bool = False) -> None:
+        with self._flush_lock:
+            with self._lock:
+                if not self._flush_due_locked(force):
+                    return
+                entries = dict(self._entries)
+                added, removed = self._added, self._removed
+                self._added, self._removed = set(), set()
+                self._dirty = False
+                self._last_flush = time.time()
+            try:
+                with _file_lock(self.lock_path):
+                    merged, evicted = self._merge(entries, added, removed)
+                    payload = {"version": 1, "entries": dict(merged)}
+                    _atomic_write(self.index_path, json.dumps(payload, indent=1).encode("utf-8"))
+            except BaseException:
+                with self._lock:
+                    self._added |= added - self._removed
+                    self._removed |= removed - self._added
+                    self._dirty = True
+                raise
+            with self._lock:
+                # Changes made here while the index was written win over the merge.
+                for fingerprint in self._removed:
+                    merged.pop(fingerprint, None)
+                for fingerprint, entry in self._entries.items():
+                    if fingerprint in self._added or (fingerprint in merged and entry.get("atime", 0) > merged[fingerprint].get("atime", 0)):
+                        merged[fingerprint] = entry
+                self._entries = OrderedDict(sorted(merged.items(), key=lambda item: item[1].get("atime", 0)))
+                self._total_bytes = sum(int(entry.get("size", 0)) for entry in self._entries.values())
+                evicted_paths = [path for fingerprint, path in evicted.items() if fingerprint not in self._entries]
+            _unlink(evicted_paths)
+
+    def _remove_locked(self, fingerprint: str) -> Path | None:
+        """Drop an entry and return its file for the caller to delete outside the lock."""
+        entry = self._entries.pop(fingerprint, None)
+        if not entry:
+            return None
+        self._total_bytes -= int(entry.get("size", 0))
+        self._added.discard(fingerprint)
+        self._removed.add(fingerprint)
+        self._dirty = True
+        return self.directory / entry["file"]
+
+    def _evict_locked(self) -> list[Path]:
+        paths = []
+        while self._total_bytes > self.max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            paths.append(self._remove_locked(oldest))
+        return paths
+
+    def _record_hit_locked(self, fingerprint: str, entry: dict[str, Any]) -> bool:
+        entry["atime"] = time.time()
+        if self._entries.get(fingerprint) is entry:
+            self._entries.move_to_end(fingerprint)
+        self._dirty = True
+        self.hits += 1
+        return self._flush_due_locked()
+
+    def _record_miss(self, fingerprint: str, entry: dict[str, Any]) -> None:
+        with self._lock:
+            self.misses += 1
+            if self._entries.get(fingerprint) is entry:
+                self._remove_locked(fingerprint)
+
+    def path_for(self, fingerprint: str) -> Path | None:
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            return self.directory / entry["file"] if entry else None
+
+    def touch(self, fingerprint: str) -> Path | None:
+        """Record a hit and return the cached file path without reading it."""
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if not entry:
+                self.misses += 1
+                return None
+        path = self.directory / entry["file"]
+        if not path.exists():
+            self._record_miss(fingerprint, entry)
+            return None
+        with self._lock:
+            flush_due = self._record_hit_locked(fingerprint, entry)
+        if flush_due:
+            self._flush()
+        return path
+
+    def get(self, fingerprint: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if not entry:
+                self.misses += 1
+                return None
+        try:
+            data = (self.directory / entry["file"]).read_bytes()
+        except FileNotFoundError:
+            self._record_miss(fingerprint, entry)
+            return None
+        with self._lock:
+            flush_due = self._record_hit_locked(fingerprint, entry)
+        if flush_due:
+            self._flush()
+        return data
+
+    def put(
+        self,
+        fingerprint: str,
+        data: bytes,
+        name_hint: str | None = None,
+        suffix: str = ".png",
+        avatar: str | None = None,
+    ) -> Path:
+        stem = re.sub(r"[^a-z0-9]+", "_", (name_hint or "card").lower()).strip("_") or "card"
+        filename = f"{stem}-{fingerprint[:16]}{suffix}"
+        path = self.directory / filename
+        _atomic_write(path, data)
+        with self._lock:
+            replaced = self._remove_locked(fingerprint)
+            entry = {"file": filename, "size": len(data), "atime": time.time()}
+            if avatar:
+                # Faceclaim filename, so renders can be dropped when that file is removed.
+                entry["avatar"] = avatar
+            self._entries[fingerprint] = entry
+            self._total_bytes += len(data)
+            self._removed.discard(fingerprint)
+            self._added.add(fingerprint)
+            self._dirty = True
+            stale = self._evict_locked()
+            if replaced is not None and replaced != path:
+                stale.append(replaced)
+            flush_due = self._flush_due_locked()
+        _unlink(stale)
+        if flush_due:
+            self._flush()
+        return path
+
+    def discard(self, fingerprint: str) -> None:
+        with self._lock:
+            path = self._remove_locked(fingerprint)
+        _unlink([path] if path else [])
+        self._flush(force=True)
+
+    def discard_avatars(self, avatars: set[str]) -> int:
+        """Drop renders made from any of the given faceclaim filenames; returns how many."""
+        with self._lock:
+            fingerprints = [fingerprint for fingerprint, entry in self._entries.items() if entry.get("avatar") in avatars]
+            paths = [self._remove_locked(fingerprint) for fingerprint in fingerprints]
+        _unlink(paths)
+        self._flush(force=True)
+        return len(fingerprints)
+
+    def flush(self) -> None:
+        self._flush(force=True)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_default_cache: RenderCache | None = None
+_default_cache_lock = threading.Lock()
+
+
+def default_render_cache() -> RenderCache:
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = RenderCache(Defaults.OUTPUT_DIR, Defaults.OUTPUT_CACHE_MAX_BYTES)
+        return _default_cache
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_SINGLE = "single"
+PRIORITY_BULK = "bulk"
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_SINGLE, PRIORITY_BULK)
+
+RENDER_WORKERS = min(4, os.cpu_count() or 1)
+STARVATION_SECONDS = 10.0
+WAIT_SAMPLES = 256
+
+
+def default_limits(workers: int) -> dict[str, int]:
+    # Bulk work never takes every worker, so an interactive render only waits
+    # for a free slot rather than for the bulk queue to drain.
+    return {
+        PRIORITY_INTERACTIVE: workers,
+        PRIORITY_SINGLE: workers,
+        PRIORITY_BULK: max(1, workers - 1),
+    }
+
+
+@dataclass
+class _Job:
+    priority: str
+    fn: Callable[..., Any]
+    args: tuple[Any, ...]
+    kwargs: dict[str, Any]
+    future: Future
+    enqueued: float = field(default_factory=time.monotonic)
+
+
+class RenderScheduler:
+    """
+    Shared render worker pool with priority classes.
+
+    Jobs are queued per class and dispatched highest class first, within each
+    class's concurrency limit. A lower-class job that has waited longer than
+    `starvation_seconds` is dispatched ahead of newer higher-class work, so bulk
+    jobs keep moving under steady interactive load. Futures cancelled while
+    queued are skipped.
+    """
+
+    def __init__(
+        self,
+        workers: int = RENDER_WORKERS,
+        limits: dict[str, int] | None = None,
+        starvation_seconds: float = STARVATION_SECONDS,
+    ):
+        self.workers = workers
+        self.limits = {**default_limits(workers), **(limits or {})}
+        self.starvation_seconds = starvation_seconds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cardmaker-render")
+        self._lock = threading.Lock()
+        self._queues: dict[str, deque[_Job]] = {priority: deque() for priority in PRIORITIES}
+        self._running = {priority: 0 for priority in PRIORITIES}
+        self._submitted = {priority: 0 for priority in PRIORITIES}
+        self._completed = {priority: 0 for priority in PRIORITIES}
+        self._waits: dict[str, deque[float]] = {priority: deque(maxlen=WAIT_SAMPLES) for priority in PRIORITIES}
+
+    def submit(self, priority: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        if priority not in self._queues:
+            raise ValueError(f"Unknown render priority '{priority}'. Expected one of: {', '.join(PRIORITIES)}.")
+        future: Future = Future()
+        with self._lock:
+            self._queues[priority].append(_Job(priority, fn, args, kwargs, future))
+            self._submitted[priority] += 1
+            self._dispatch_locked()
+        return future
+
+    def _pick_locked(self) -> _Job | None:
+        ready = [
+            priority
+            for priority in PRIORITIES
+            if self._queues[priority] and self._running[priority] < self.limits[priority]
+        ]
+        if not ready:
+            return None
+        now = time.monotonic()
+        starved = [
+            priority
+            for priority in ready[1:]
+            if now - self._queues[priority][0].enqueued >= self.starvation_seconds
+        ]
+        return self._queues[(starved or ready)[0]].popleft()
+
+    def _dispatch_locked(self) -> None:
+        while sum(self._running.values()) < self.workers:
+            job = self._pick_locked()
+            if job is None:
+                return
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            self._running[job.priority] += 1
+            self._waits[job.priority].append(time.monotonic() - job.enqueued)
+            self._executor.submit(self._run, job)
+
+    def _run(self, job: _Job) -> None:
+        try:
+            job.future.set_result(job.fn(*job.args, **job.kwargs))
+        except BaseException as exc:
+            job.future.set_exception(exc)
+        finally:
+            with self._lock:
+                self._running[job.priority] -= 1
+                self._completed[job.priority] += 1
+                self._dispatch_locked()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            classes = {}
+            for priority in PRIORITIES:
+                waits = self._waits[priority]
+                classes[priority] = {
+                    "queued": sum(1 for job in self._queues[priority] if not job.future.cancelled()),
+                    "running": self._running[priority],
+                    "limit": self.limits[priority],
+                    "submitted": self._submitted[priority],
+                    "completed": self._completed[priority],
+                    "wait_avg_ms": sum(waits) / len(waits) * 1000 if waits else 0.0,
+                    "wait_max_ms": max(waits) * 1000 if waits else 0.0,
+                }
+            return {"workers": self.workers, "classes": classes}
+
+
+_default_scheduler: RenderScheduler | None = None
+_default_scheduler_lock = threading.Lock()
+
+
+def default_render_scheduler() -> RenderScheduler:
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RenderScheduler()
+        return _default_scheduler
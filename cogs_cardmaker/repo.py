@@ -1,18 +1,62 @@
 from __future__ import annotations
 
 import asyncio
+import copy
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, AsyncIterator, Iterable, Iterator
 
 from pymongo import ReturnDocument
 
 from cogs_cardmaker.service import generated_starter_body, normalize_username, template_role_for
+from services.audit_writer import default_audit_writer
+from services.guild_config import default_guild_config_cache
 
 
 CHARACTER_COLLECTION = "cardmaker_characters"
 DELETED_COLLECTION = "cardmaker_deleted"
 AUDIT_COLLECTION = "cardmaker_audit"
 CONFIG_COLLECTION = "guild_config"
+POSTALL_COLLECTION = "cardmaker_postall_runs"
+# Bump together with a migration in backfill_schema.py when the stored shape
+# of character documents changes.
+SCHEMA_VERSION = 1
+ACTIVE_STATUSES = ["active", "Active", None]
+CHARACTER_CACHE_SIZE = 256
+THREAD_INDEX_SIZE = 4096
+# Import and migration scripts write the collection directly, so cached entries
+# are also re-read from MongoDB after this long.
+CHARACTER_CACHE_TTL_SECONDS = 300.0
+# Everything posting a card reads: thread title, starter body, tags, the render
+# and the resource post.
+POSTING_PROJECTION = {
+    field: 1
+    for field in [
+        "source_doc_id",
+        "name",
+        "role",
+        "scope",
+        "type",
+        "username",
+        "userid",
+        "avatar_path",
+        "footer_text",
+        "source_url",
+        "class",
+        "nationality",
+        "affiliation",
+        "occupation",
+        "alignment",
+        "safe_name",
+        "output_path",
+        "card",
+        "discord.starter_body",
+        "admin.status",
+        "schema_version",
+    ]
+}
 
 
 def utc_now() -> datetime:
@@ -27,177 +71,416 @@ def default_discord_block(character: dict[str, Any] | None = None) -> dict[str,
     }
 
 
+_MISS = object()
+
+
+def _id_values(value: int | str) -> list[int | str]:
+    # Discord ids are stored as strings, but older imports saved some as numbers.
+    text = str(value)
+    return [text, int(text)] if text.isdigit() else [text]
+
+
+def _postable_in(doc: dict[str, Any] | None, guild_id: int) -> bool:
+    posts = (doc or {}).get("discord", {}).get("posts") or []
+    return bool(doc) and not any(str(post.get("guild_id")) == str(guild_id) for post in posts)
+
+
+def _get_path(doc: dict[str, Any], key: str) -> Any:
+    value: Any = doc
+    for part in key.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _apply_set(doc: dict[str, Any], fields: dict[str, Any]) -> dict[str, Any]:
+    """The document as MongoDB stores it after `{"$set": fields}`, copying only the dicts on each path."""
+    updated = dict(doc)
+    for key, value in fields.items():
+        parts = key.split(".")
+        target = updated
+        for part in parts[:-1]:
+            child = target.get(part)
+            target[part] = dict(child) if isinstance(child, dict) else {}
+            target = target[part]
+        target[parts[-1]] = value
+    return updated
+
+
+def _thread_ids(doc: dict[str, Any]) -> set[str]:
+    return {str(post.get("thread_id")) for post in (doc.get("discord") or {}).get("posts") or []}
+
+
+class CharacterCache:
+    """
+    Write-through cache of character documents for the cog's hot lookups.
+
+    Thread lookups go through an index from thread id to character id, which
+    also remembers threads that belong to no character, so edits in unrelated
+    forum threads stop reaching MongoDB. Documents are kept in a small LRU. Repo
+    writes put the document they return or drop the stale copy. A thread entry is
+    only served while the cached document still lists that thread.
+
+    Every write stamps the character and thread ids it touches with a new
+    generation. Read-through stores pass the generation taken before their
+    query and are skipped when any of their ids was written since, so a slow
+    read cannot put back a document older than a concurrent write.
+    """
+
+    def __init__(
+        self,
+        max_documents: int = CHARACTER_CACHE_SIZE,
+        max_threads: int = THREAD_INDEX_SIZE,
+        ttl_seconds: float = CHARACTER_CACHE_TTL_SECONDS,
+    ):
+        self.max_documents = max_documents
+        self.max_threads = max_threads
+        self.ttl_seconds = ttl_seconds
+        self._documents: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._threads: OrderedDict[str, tuple[float, str | None]] = OrderedDict()
+        self._generation = 0
+        self._generations: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _fresh(self, stored_at: float) -> bool:
+        return time.monotonic() - stored_at < self.ttl_seconds
+
+    def _document_locked(self, character_id: str) -> dict[str, Any] | None:
+        entry = self._documents.get(character_id)
+        if entry is None or not self._fresh(entry[0]):
+            return None
+        self._documents.move_to_end(character_id)
+        return entry[1]
+
+    def by_id(self, character_id: str) -> Any:
+        """The cached document, or _MISS."""
+        with self._lock:
+            doc = self._document_locked(str(character_id))
+            if doc is None:
+                self.misses += 1
+                return _MISS
+            self.hits += 1
+            return copy.deepcopy(doc)
+
+    def by_thread(self, thread_id: int | str) -> Any:
+        """The cached document for a thread, None for a known non-card thread, or _MISS."""
+        key = str(thread_id)
+        with self._lock:
+            entry = self._threads.get(key)
+            if entry is not None and self._fresh(entry[0]):
+                character_id = entry[1]
+                doc = self._document_locked(character_id) if character_id is not None else None
+                if character_id is None or (doc is not None and key in _thread_ids(doc)):
+                    self._threads.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(doc)
+            self.misses += 1
+            return _MISS
+
+    def _index_thread_locked(self, thread_id: str, character_id: str | None, now: float) -> None:
+        self._threads[thread_id] = (now, character_id)
+        self._threads.move_to_end(thread_id)
+        while len(self._threads) > self.max_threads:
+            self._threads.popitem(last=False)
+
+    def generation(self) -> int:
+        """Taken before a read-through query and passed to put/put_thread with its result."""
+        with self._lock:
+            return self._generation
+
+    def _written_locked(self, keys: list[tuple[str, str]]) -> None:
+        self._generation += 1
+        for key in keys:
+            self._generations[key] = self._generation
+
+    def _stale_locked(self, generation: int | None, keys: list[tuple[str, str]]) -> bool:
+        # A write (no generation) is never stale; it stamps its ids instead.
+        if generation is None:
+            self._written_locked(keys)
+            return False
+        return any(self._generations.get(key, 0) > generation for key in keys)
+
+    def put(self, doc: dict[str, Any] | None, generation: int | None = None) -> None:
+        if not doc or "_id" not in doc:
+            return
+        character_id = str(doc["_id"])
+        keys = [("character", character_id), *(("thread", thread_id) for thread_id in _thread_ids(doc))]
+        now = time.monotonic()
+        with self._lock:
+            if self._stale_locked(generation, keys):
+                return
+            self._documents[character_id] = (now, copy.deepcopy(doc))
+            self._documents.move_to_end(character_id)
+            while len(self._documents) > self.max_documents:
+                self._documents.popitem(last=False)
+            for thread_id in _thread_ids(doc):
+                self._index_thread_locked(thread_id, character_id, now)
+
+    def put_thread(self, thread_id: int | str, character_id: str | None, generation: int | None = None) -> None:
+        with self._lock:
+            if self._stale_locked(generation, [("thread", str(thread_id))]):
+                return
+            self._index_thread_locked(str(thread_id), str(character_id) if character_id is not None else None, time.monotonic())
+
+    def forget(self, character_id: str) -> None:
+        with self._lock:
+            self._written_locked([("character", str(character_id))])
+            self._documents.pop(str(character_id), None)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "documents": len(self._documents),
+                "threads": len(self._threads),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def _legacy_backfill(doc: dict[str, Any]) -> dict[str, Any] | None:
+    """
+    Normalize a document backfill_schema.py has not migrated yet, in place.
+
+    Returns the `$set` that stores the result, or None for a current document.
+    The write stamps schema_version, so this runs at most once per document.
+    """
+    if doc.get("schema_version", 0) >= SCHEMA_VERSION:
+        return None
+    changed = False
+    if not doc.get("scope"):
+        doc["scope"] = "full"
+        changed = True
+    discord_block = dict(doc.get("discord") or {})
+    defaults = {"posts": []}
+    if "starter_body" not in discord_block:
+        defaults["starter_body"] = generated_starter_body(doc)
+    legacy_post = None
+    if discord_block.get("guild_id") and discord_block.get("thread_id"):
+        legacy_post = {
+            "guild_id": discord_block.get("guild_id"),
+            "forum_channel_id": discord_block.get("forum_channel_id"),
+            "thread_id": discord_block.get("thread_id"),
+            "starter_message_id": discord_block.get("starter_message_id"),
+            "card_message_id": discord_block.get("card_message_id"),
+            "post_status": discord_block.get("post_status") or "posted",
+            "last_posted_at": discord_block.get("last_posted_at"),
+            "last_synced_at": discord_block.get("last_synced_at"),
+            "last_error": discord_block.get("last_error"),
+        }
+    for key, value in defaults.items():
+        if key not in discord_block:
+            discord_block[key] = value
+            changed = True
+    if legacy_post and not discord_block.get("posts"):
+        discord_block["posts"] = [legacy_post]
+        changed = True
+    for key in [
+        "guild_id",
+        "forum_channel_id",
+        "thread_id",
+        "starter_message_id",
+        "card_message_id",
+        "post_status",
+        "last_posted_at",
+        "last_synced_at",
+        "last_error",
+    ]:
+        if key in discord_block:
+            discord_block.pop(key, None)
+            changed = True
+    doc["discord"] = discord_block
+    doc["schema_version"] = SCHEMA_VERSION
+    update = {"schema_version": SCHEMA_VERSION}
+    if changed:
+        update.update({"scope": doc["scope"], "discord": discord_block})
+    return update
+
+
 class CardmakerRepo:
-    def __init__(self, db):
+    """
+    Character, deletion, audit and guild config storage for the cardmaker cog.
+
+    `db` is an AsyncMongoClient database, awaited directly on the event loop.
+    `sync_db` is the same database through a synchronous client. It is used only
+    by work that already runs in threads: the bulk render iterators and the
+    background audit writer.
+    """
+
+    def __init__(self, db, sync_db):
         self.db = db
         self.characters = db[CHARACTER_COLLECTION]
         self.deleted = db[DELETED_COLLECTION]
         self.audit = db[AUDIT_COLLECTION]
         self.config = db[CONFIG_COLLECTION]
+        self.postall_runs = db[POSTALL_COLLECTION]
+        self.sync_characters = sync_db[CHARACTER_COLLECTION]
+        self.sync_audit = sync_db[AUDIT_COLLECTION]
+        self.cache = CharacterCache()
         asyncio.get_event_loop().create_task(self.ensure_indexes())
 
     async def ensure_indexes(self) -> None:
-        def _do():
-            self.characters.create_index("source_doc_id")
-            self.characters.create_index("source_url")
-            self.characters.create_index("safe_name")
-            self.characters.create_index("userid")
-            self.characters.create_index("username")
-            self.characters.create_index("role")
-            self.characters.create_index("scope")
-            self.characters.create_index("type")
-            self.characters.create_index("admin.status")
-            self.characters.create_index("discord.posts.guild_id")
-            self.deleted.create_index("deletion.at")
-            self.deleted.create_index("deletion.by")
-            self.deleted.create_index("deletion.original_id")
-            self.audit.create_index([("character_id", 1), ("created_at", -1)])
-            self.audit.create_index([("actor_id", 1), ("created_at", -1)])
-        await asyncio.to_thread(_do)
-
-    def _backfill_doc(self, doc: dict[str, Any] | None) -> dict[str, Any] | None:
+        await self.characters.create_index("source_doc_id")
+        await self.characters.create_index("source_url")
+        await self.characters.create_index("safe_name")
+        await self.characters.create_index("userid")
+        await self.characters.create_index("username")
+        await self.characters.create_index("role")
+        await self.characters.create_index("scope")
+        await self.characters.create_index("type")
+        await self.characters.create_index("admin.status")
+        await self.characters.create_index("discord.posts.guild_id")
+        await self.characters.create_index("discord.posts.thread_id")
+        await self.characters.create_index([("admin.status", 1), ("discord.posts.guild_id", 1)])
+        await self.deleted.create_index("deletion.at")
+        await self.deleted.create_index("deletion.by")
+        await self.deleted.create_index("deletion.original_id")
+        await self.audit.create_index([("character_id", 1), ("created_at", -1)])
+        await self.audit.create_index([("actor_id", 1), ("created_at", -1)])
+
+    async def _backfill_doc(self, doc: dict[str, Any] | None) -> dict[str, Any] | None:
         if not doc:
             return None
-        changed = False
-        if not doc.get("scope"):
-            doc["scope"] = "full"
-            changed = True
-        discord_block = dict(doc.get("discord") or {})
-        defaults = default_discord_block(doc)
-        legacy_post = None
-        if discord_block.get("guild_id") and discord_block.get("thread_id"):
-            legacy_post = {
-                "guild_id": discord_block.get("guild_id"),
-                "forum_channel_id": discord_block.get("forum_channel_id"),
-                "thread_id": discord_block.get("thread_id"),
-                "starter_message_id": discord_block.get("starter_message_id"),
-                "card_message_id": discord_block.get("card_message_id"),
-                "post_status": discord_block.get("post_status") or "posted",
-                "last_posted_at": discord_block.get("last_posted_at"),
-                "last_synced_at": discord_block.get("last_synced_at"),
-                "last_error": discord_block.get("last_error"),
-            }
-        for key, value in defaults.items():
-            if key not in discord_block:
-                discord_block[key] = value
-                changed = True
-        if legacy_post and not discord_block.get("posts"):
-            discord_block["posts"] = [legacy_post]
-            changed = True
-        for key in [
-            "guild_id",
-            "forum_channel_id",
-            "thread_id",
-            "starter_message_id",
-            "card_message_id",
-            "post_status",
-            "last_posted_at",
-            "last_synced_at",
-            "last_error",
-        ]:
-            if key in discord_block:
-                discord_block.pop(key, None)
-                changed = True
-        doc["discord"] = discord_block
-        if changed:
-            self.characters.update_one(
-                {"_id": doc["_id"]},
-                {"$set": {"scope": doc["scope"], "discord": discord_block}},
-            )
+        update = _legacy_backfill(doc)
+        if update:
+            await self.characters.update_one({"_id": doc["_id"]}, {"$set": update})
         return doc
 
+    def _backfill_doc_sync(self, doc: dict[str, Any] | None) -> dict[str, Any] | None:
+        if not doc:
+            return None
+        update = _legacy_backfill(doc)
+        if update:
+            self.sync_characters.update_one({"_id": doc["_id"]}, {"$set": update})
+        return doc
+
+    async def _backfill_all(self, cursor) -> list[dict[str, Any]]:
+        return [doc for doc in [await self._backfill_doc(doc) async for doc in cursor] if doc]
+
     async def get_character(self, character_id: str) -> dict[str, Any] | None:
-        return await asyncio.to_thread(lambda: self._backfill_doc(self.characters.find_one({"_id": character_id})))
+        cached = self.cache.by_id(character_id)
+        if cached is not _MISS:
+            return cached
+        generation = self.cache.generation()
+        doc = await self._backfill_doc(await self.characters.find_one({"_id": character_id}))
+        self.cache.put(doc, generation=generation)
+        return doc
 
     async def find_by_doc_id(self, doc_id: str) -> list[dict[str, Any]]:
-        def _do():
-            docs = list(self.characters.find({"source_doc_id": doc_id}).sort("name", 1))
-            return [self._backfill_doc(doc) for doc in docs if doc]
-        return await asyncio.to_thread(_do)
+        return await self._backfill_all(self.characters.find({"source_doc_id": doc_id}).sort("name", 1))
 
     async def find_one_by_reference(self, ref: str) -> tuple[dict[str, Any] | None, list[dict[str, Any]]]:
         from cogs_cardmaker.service import extract_doc_id
 
         doc_id = extract_doc_id(ref)
-
-        def _do():
-            direct = self.characters.find_one({"_id": ref})
-            if direct:
-                direct = self._backfill_doc(direct)
-                return direct, [direct]
-            if doc_id:
-                docs = [self._backfill_doc(doc) for doc in self.characters.find({"source_doc_id": doc_id}).sort("name", 1)]
-                docs = [doc for doc in docs if doc]
-                return (docs[0] if len(docs) == 1 else None), docs
-            docs = [self._backfill_doc(doc) for doc in self.characters.find({"safe_name": ref}).sort("name", 1)]
-            docs = [doc for doc in docs if doc]
-            return (docs[0] if len(docs) == 1 else None), docs
-
-        return await asyncio.to_thread(_do)
+        direct = await self.characters.find_one({"_id": ref})
+        if direct:
+            direct = await self._backfill_doc(direct)
+            return direct, [direct]
+        query = {"source_doc_id": doc_id} if doc_id else {"safe_name": ref}
+        docs = await self._backfill_all(self.characters.find(query).sort("name", 1))
+        return (docs[0] if len(docs) == 1 else None), docs
 
     async def find_by_thread_id(self, thread_id: int) -> dict[str, Any] | None:
-        def _do():
-            return self._backfill_doc(self.characters.find_one({
-                "discord.posts.thread_id": str(thread_id)
-            }))
-        return await asyncio.to_thread(_do)
-
-    async def list_postable(self, guild_id: int) -> list[dict[str, Any]]:
-        def _do():
-            docs = list(self.characters.find({
-                "admin.status": {"$in": ["active", "Active", None]},
-            }).sort("$natural", 1))
-            results = []
-            for doc in docs:
-                doc = self._backfill_doc(doc)
-                if not doc:
-                    continue
-                posts = (doc.get("discord") or {}).get("posts") or []
-                if any(str(p.get("guild_id")) == str(guild_id) for p in posts):
-                    continue
-                results.append(doc)
-            return results
-        return await asyncio.to_thread(_do)
+        cached = self.cache.by_thread(thread_id)
+        if cached is not _MISS:
+            return cached
+        generation = self.cache.generation()
+        doc = await self._backfill_doc(await self.characters.find_one({
+            "discord.posts.thread_id": str(thread_id)
+        }))
+        if doc:
+            self.cache.put(doc, generation=generation)
+        else:
+            self.cache.put_thread(thread_id, None, generation=generation)
+        return doc
+
+    def _postable_query(self, guild_id: int, skip_ids: Iterable[str] = ()) -> dict[str, Any]:
+        query: dict[str, Any] = {
+            "admin.status": {"$in": ACTIVE_STATUSES},
+            "discord.posts": {"$not": {"$elemMatch": {"guild_id": {"$in": _id_values(guild_id)}}}},
+        }
+        skip_ids = list(skip_ids)
+        if skip_ids:
+            query["_id"] = {"$nin": skip_ids}
+        return query
+
+    async def count_postable(self, guild_id: int, skip_ids: Iterable[str] = ()) -> int:
+        return await self.characters.count_documents(self._postable_query(guild_id, skip_ids))
+
+    def iter_postable_sync(self, guild_id: int, skip_ids: Iterable[str] = ()) -> Iterator[dict[str, Any]]:
+        # Active characters not yet posted in this guild, filtered and projected by
+        # the server and streamed from a cursor, for bulk work off the event loop.
+        query = self._postable_query(guild_id, skip_ids)
+        with self.sync_characters.find(query, POSTING_PROJECTION).sort("name", 1).batch_size(100) as cursor:
+            for doc in cursor:
+                if doc.get("schema_version", 0) < SCHEMA_VERSION:
+                    # Legacy post fields are not visible to the query, so check the
+                    # normalized full document. Never backfill a projection.
+                    doc = self._backfill_doc_sync(self.sync_characters.find_one({"_id": doc["_id"]}))
+                    if not _postable_in(doc, guild_id):
+                        continue
+                yield doc
+
+    async def iter_postable(self, guild_id: int, skip_ids: Iterable[str] = ()) -> AsyncIterator[dict[str, Any]]:
+        query = self._postable_query(guild_id, skip_ids)
+        async with self.characters.find(query, POSTING_PROJECTION).sort("name", 1).batch_size(100) as cursor:
+            async for doc in cursor:
+                if doc.get("schema_version", 0) < SCHEMA_VERSION:
+                    doc = await self._backfill_doc(await self.characters.find_one({"_id": doc["_id"]}))
+                    if not _postable_in(doc, guild_id):
+                        continue
+                yield doc
+
+    def iter_characters_sync(self, status: str = "active") -> Iterator[dict[str, Any]]:
+        # Streams from a cursor for bulk work that already runs off the event loop.
+        if status == "all":
+            query: dict[str, Any] = {}
+        elif status == "active":
+            query = {"admin.status": {"$in": ["active", "Active", None]}}
+        else:
+            query = {"admin.status": {"$in": [status, status.capitalize()]}}
+        with self.sync_characters.find(query).sort("name", 1).batch_size(100) as cursor:
+            yield from cursor
 
     async def create_character(self, character: dict[str, Any]) -> dict[str, Any]:
-        def _do():
-            self.characters.insert_one(character)
-            return self._backfill_doc(character)
-        return await asyncio.to_thread(_do)
+        await self.characters.insert_one(character)
+        doc = await self._backfill_doc(character)
+        self.cache.put(doc)
+        return doc
 
     async def delete_character(self, character_id: str, actor_id: int | str | None) -> dict[str, Any] | None:
         now = utc_now()
-
-        def _do():
-            doc = self.characters.find_one({"_id": character_id})
-            if not doc:
-                return None
-            deleted_doc = dict(doc)
-            deleted_doc["deletion"] = {
-                "original_id": character_id,
-                "at": now,
-                "by": str(actor_id) if actor_id is not None else None,
-            }
-            self.deleted.replace_one({"_id": character_id}, deleted_doc, upsert=True)
-            self.characters.delete_one({"_id": character_id})
-            self._insert_audit_sync(character_id, actor_id, "card_deleted", {"old": doc})
-            return deleted_doc
-
-        return await asyncio.to_thread(_do)
+        doc = await self.characters.find_one({"_id": character_id})
+        if not doc:
+            return None
+        deleted_doc = dict(doc)
+        deleted_doc["deletion"] = {
+            "original_id": character_id,
+            "at": now,
+            "by": str(actor_id) if actor_id is not None else None,
+        }
+        await self.deleted.replace_one({"_id": character_id}, deleted_doc, upsert=True)
+        await self.characters.delete_one({"_id": character_id})
+        self.cache.forget(character_id)
+        self._queue_audit(character_id, actor_id, "card_deleted", {"old": doc})
+        return deleted_doc
 
     async def restore_deleted_character(self, character_id: str, actor_id: int | str | None, kind: str, details: dict[str, Any]) -> dict[str, Any] | None:
-        def _do():
-            deleted_doc = self.deleted.find_one({"_id": character_id})
-            if not deleted_doc:
-                return None
-            restored_doc = dict(deleted_doc)
-            restored_doc.pop("deletion", None)
-            self.characters.replace_one({"_id": character_id}, restored_doc, upsert=True)
-            self.deleted.delete_one({"_id": character_id})
-            self._insert_audit_sync(character_id, actor_id, kind, details)
-            return restored_doc
-
-        return await asyncio.to_thread(_do)
+        deleted_doc = await self.deleted.find_one({"_id": character_id})
+        if not deleted_doc:
+            return None
+        restored_doc = dict(deleted_doc)
+        restored_doc.pop("deletion", None)
+        await self.characters.replace_one({"_id": character_id}, restored_doc, upsert=True)
+        await self.deleted.delete_one({"_id": character_id})
+        self.cache.put(restored_doc)
+        self._queue_audit(character_id, actor_id, kind, details)
+        return restored_doc
 
     async def update_fields(self, character_id: str, fields: dict[str, Any], actor_id: int | str | None, kind: str) -> dict[str, Any] | None:
         now = utc_now()
@@ -206,16 +489,18 @@ class CardmakerRepo:
         if actor_id is not None:
             fields["admin.updated_by"] = str(actor_id)
 
-        def _do():
-            old = self.characters.find_one({"_id": character_id}) or {}
-            doc = self.characters.find_one_and_update(
-                {"_id": character_id},
-                {"$set": fields},
-                return_document=ReturnDocument.AFTER,
-            )
-            self._insert_audit_sync(character_id, actor_id, kind, {"fields": fields, "old": old})
-            return self._backfill_doc(doc)
-        return await asyncio.to_thread(_do)
+        old = await self.characters.find_one_and_update(
+            {"_id": character_id},
+            {"$set": fields},
+            return_document=ReturnDocument.BEFORE,
+        )
+        if not old:
+            self.cache.forget(character_id)
+            return None
+        doc = await self._backfill_doc(_apply_set(old, fields))
+        self.cache.put(doc)
+        self._queue_audit(character_id, actor_id, kind, {"fields": fields, "old": {key: _get_path(old, key) for key in fields}})
+        return doc
 
     async def mark_posted(
         self,
@@ -227,6 +512,7 @@ class CardmakerRepo:
         starter_message_id: int | None,
         resource_message_id: int | None,
         actor_id: int | str | None,
+        resource_faceclaim: dict[str, Any] | None = None,
     ) -> None:
         now = utc_now()
         post_doc = {
@@ -236,35 +522,33 @@ class CardmakerRepo:
             "starter_message_id": str(starter_message_id) if starter_message_id else None,
             "resource_message_id": str(resource_message_id) if resource_message_id else None,
             "card_message_id": str(starter_message_id) if starter_message_id else None,
+            "resource_faceclaim": resource_faceclaim,
             "post_status": "posted",
             "last_posted_at": now,
             "last_synced_at": now,
             "last_error": None,
         }
 
-        def _do():
-            doc = self.characters.find_one({"_id": character_id}) or {}
-            discord_block = dict(doc.get("discord") or {})
-            posts = list(discord_block.get("posts") or [])
-            replaced = False
-            for index, existing in enumerate(posts):
-                if str(existing.get("guild_id")) == str(guild_id):
-                    posts[index] = post_doc
-                    replaced = True
-                    break
-            if not replaced:
-                posts.append(post_doc)
-
-            update = {
-                "discord.posts": posts,
-                "admin.updated_at": now,
-            }
-            if actor_id is not None:
-                update["admin.updated_by"] = str(actor_id)
-            self.characters.update_one({"_id": character_id}, {"$set": update})
-            self._insert_audit_sync(character_id, actor_id, "card_posted", {"post": post_doc})
+        # Replace this guild's post, or append one, in a single pipeline update so
+        # concurrent writes to other posts or fields are never overwritten.
+        posts = {"$ifNull": ["$discord.posts", []]}
+        same_guild = {"$eq": [{"$toString": "$$post.guild_id"}, str(guild_id)]}
+        new_post = {"$literal": post_doc}
+        update = {
+            "discord.posts": {"$cond": [
+                {"$in": [str(guild_id), {"$map": {"input": posts, "as": "post", "in": {"$toString": "$$post.guild_id"}}}]},
+                {"$map": {"input": posts, "as": "post", "in": {"$cond": [same_guild, new_post, "$$post"]}}},
+                {"$concatArrays": [posts, [new_post]]},
+            ]},
+            "admin.updated_at": now,
+        }
+        if actor_id is not None:
+            update["admin.updated_by"] = str(actor_id)
 
-        await asyncio.to_thread(_do)
+        await self.characters.update_one({"_id": character_id}, [{"$set": update}])
+        self.cache.forget(character_id)
+        self.cache.put_thread(thread_id, character_id)
+        self._queue_audit(character_id, actor_id, "card_posted", {"post": post_doc})
 
     async def set_resource_message_id(
         self,
@@ -273,37 +557,47 @@ class CardmakerRepo:
         thread_id: int,
         resource_message_id: int,
         actor_id: int | str | None,
+        resource_faceclaim: dict[str, Any] | None = None,
     ) -> None:
         now = utc_now()
 
-        def _do():
-            doc = self.characters.find_one({"_id": character_id}) or {}
-            discord_block = dict(doc.get("discord") or {})
-            posts = list(discord_block.get("posts") or [])
-            changed = False
-            for post in posts:
-                if str(post.get("thread_id")) == str(thread_id):
-                    post["resource_message_id"] = str(resource_message_id)
-                    post["last_synced_at"] = now
-                    changed = True
-                    break
-            if not changed:
-                return
-            update = {
-                "discord.posts": posts,
-                "admin.updated_at": now,
-            }
-            if actor_id is not None:
-                update["admin.updated_by"] = str(actor_id)
-            self.characters.update_one({"_id": character_id}, {"$set": update})
-            self._insert_audit_sync(
-                character_id,
-                actor_id,
-                "card_resource_message_linked",
-                {"thread_id": str(thread_id), "resource_message_id": str(resource_message_id)},
-            )
-
-        await asyncio.to_thread(_do)
+        update = {
+            "discord.posts.$.resource_message_id": str(resource_message_id),
+            "discord.posts.$.resource_faceclaim": resource_faceclaim,
+            "discord.posts.$.last_synced_at": now,
+            "admin.updated_at": now,
+        }
+        if actor_id is not None:
+            update["admin.updated_by"] = str(actor_id)
+
+        result = await self.characters.update_one(
+            {"_id": character_id, "discord.posts.thread_id": {"$in": _id_values(thread_id)}},
+            {"$set": update},
+        )
+        if not result.matched_count:
+            return
+        self.cache.forget(character_id)
+        self._queue_audit(
+            character_id,
+            actor_id,
+            "card_resource_message_linked",
+            {"thread_id": str(thread_id), "resource_message_id": str(resource_message_id)},
+        )
+
+    async def set_resource_faceclaim(
+        self,
+        character_id: str,
+        *,
+        thread_id: int,
+        resource_faceclaim: dict[str, Any] | None,
+    ) -> None:
+        # Bumps admin.updated_at like every other post write, since
+        # backfill_schema guards its replaces on it.
+        await self.characters.update_one(
+            {"_id": character_id, "discord.posts.thread_id": {"$in": _id_values(thread_id)}},
+            {"$set": {"discord.posts.$.resource_faceclaim": resource_faceclaim, "admin.updated_at": utc_now()}},
+        )
+        self.cache.forget(character_id)
 
     async def remove_post_for_guild(
         self,
@@ -315,41 +609,31 @@ class CardmakerRepo:
     ) -> dict[str, Any] | None:
         now = utc_now()
 
-        def _do():
-            doc = self.characters.find_one({"_id": character_id})
-            if not doc:
-                return None
-            discord_block = dict(doc.get("discord") or {})
-            old_posts = list(discord_block.get("posts") or [])
-            posts = [
-                post for post in old_posts
-                if not (
-                    str(post.get("guild_id")) == str(guild_id)
-                    and (thread_id is None or str(post.get("thread_id")) == str(thread_id))
-                )
-            ]
-            if len(posts) == len(old_posts):
-                return self._backfill_doc(doc)
-
-            update = {
-                "discord.posts": posts,
-                "admin.updated_at": now,
-            }
-            if actor_id is not None:
-                update["admin.updated_by"] = str(actor_id)
-            self.characters.update_one({"_id": character_id}, {"$set": update})
-            self._insert_audit_sync(
-                character_id,
-                actor_id,
-                "stale_card_thread_unlinked",
-                {"guild_id": str(guild_id), "thread_id": str(thread_id) if thread_id is not None else None},
-            )
-            updated = dict(doc)
-            discord_block["posts"] = posts
-            updated["discord"] = discord_block
-            return self._backfill_doc(updated)
-
-        return await asyncio.to_thread(_do)
+        stale = {"guild_id": {"$in": _id_values(guild_id)}}
+        if thread_id is not None:
+            stale["thread_id"] = {"$in": _id_values(thread_id)}
+        update: dict[str, Any] = {"admin.updated_at": now}
+        if actor_id is not None:
+            update["admin.updated_by"] = str(actor_id)
+
+        # Only matches while a stale post is still there, so an unchanged card
+        # is read back without a write or an audit entry.
+        doc = await self.characters.find_one_and_update(
+            {"_id": character_id, "discord.posts": {"$elemMatch": stale}},
+            {"$pull": {"discord.posts": stale}, "$set": update},
+            return_document=ReturnDocument.AFTER,
+        )
+        if not doc:
+            return await self._backfill_doc(await self.characters.find_one({"_id": character_id}))
+        doc = await self._backfill_doc(doc)
+        self.cache.put(doc)
+        self._queue_audit(
+            character_id,
+            actor_id,
+            "stale_card_thread_unlinked",
+            {"guild_id": str(guild_id), "thread_id": str(thread_id) if thread_id is not None else None},
+        )
+        return doc
 
     async def set_last_error(self, character_id: str, message: str, actor_id: int | str | None = None) -> None:
         await self.update_fields(
@@ -359,6 +643,42 @@ class CardmakerRepo:
             "error",
         )
 
+    async def get_postall_run(self, guild_id: int) -> dict[str, Any] | None:
+        """The guild's unfinished postall checkpoint, if a run was interrupted."""
+        return await self.postall_runs.find_one({"_id": str(guild_id), "status": "running"})
+
+    async def start_postall_run(self, guild_id: int, *, actor_id: int | str, total: int) -> dict[str, Any]:
+        now = utc_now()
+        run = {
+            "_id": str(guild_id),
+            "status": "running",
+            "started_by": str(actor_id),
+            "started_at": now,
+            "updated_at": now,
+            "total": total,
+            "posted": 0,
+            "failed": [],
+            "current": None,
+        }
+        await self.postall_runs.replace_one({"_id": run["_id"]}, run, upsert=True)
+        return run
+
+    async def update_postall_run(self, guild_id: int, **fields: Any) -> None:
+        await self.postall_runs.update_one({"_id": str(guild_id)}, {"$set": {**fields, "updated_at": utc_now()}})
+
+    async def record_postall_result(self, guild_id: int, character_id: str, *, posted: bool, error: str | None = None) -> None:
+        # Characters that were not posted are listed, so a resumed run skips them
+        # instead of failing on them again.
+        update: dict[str, Any] = {"$set": {"current": None, "updated_at": utc_now()}}
+        if posted:
+            update["$inc"] = {"posted": 1}
+        else:
+            update["$push"] = {"failed": {"character_id": character_id, "error": error}}
+        await self.postall_runs.update_one({"_id": str(guild_id)}, update)
+
+    async def finish_postall_run(self, guild_id: int) -> None:
+        await self.update_postall_run(guild_id, status="complete", current=None, finished_at=utc_now())
+
     async def set_card_channels(self, guild_id: int, *, full_channel_id: int | None = None, minor_channel_id: int | None = None) -> None:
         update = {}
         if full_channel_id is not None:
@@ -366,42 +686,35 @@ class CardmakerRepo:
         if minor_channel_id is not None:
             update["cardmaker_minor_forum_channel_id"] = str(minor_channel_id)
 
-        def _do():
-            self.config.update_one({"guild_id": str(guild_id)}, {"$set": update}, upsert=True)
-        await asyncio.to_thread(_do)
+        await self.config.update_one({"guild_id": str(guild_id)}, {"$set": update}, upsert=True)
+        default_guild_config_cache().invalidate(self.config, guild_id)
 
     async def set_default_design(self, guild_id: int, design: str) -> None:
-        def _do():
-            self.config.update_one(
-                {"guild_id": str(guild_id)},
-                {"$set": {"cardmaker_default_design": design}},
-                upsert=True,
-            )
-        await asyncio.to_thread(_do)
+        await self.config.update_one(
+            {"guild_id": str(guild_id)},
+            {"$set": {"cardmaker_default_design": design}},
+            upsert=True,
+        )
+        default_guild_config_cache().invalidate(self.config, guild_id)
 
     async def set_approved_role_ids(self, guild_id: int, role_ids: list[int]) -> None:
-        def _do():
-            self.config.update_one(
-                {"guild_id": str(guild_id)},
-                {"$set": {"cardmaker_approved_role_ids": [str(role_id) for role_id in role_ids]}},
-                upsert=True,
-            )
-        await asyncio.to_thread(_do)
+        await self.config.update_one(
+            {"guild_id": str(guild_id)},
+            {"$set": {"cardmaker_approved_role_ids": [str(role_id) for role_id in role_ids]}},
+            upsert=True,
+        )
+        default_guild_config_cache().invalidate(self.config, guild_id)
 
     async def get_config(self, guild_id: int) -> dict[str, Any]:
-        def _do():
-            cfg = self.config.find_one({"guild_id": str(guild_id)})
-            if not cfg:
-                cfg = {"guild_id": str(guild_id)}
-                self.config.insert_one(cfg)
-            return cfg
-        return await asyncio.to_thread(_do)
+        # Served from the shared cache; a guild without settings is not written
+        # on read, since the setters upsert.
+        return await default_guild_config_cache().get(self.config, guild_id) or {"guild_id": str(guild_id)}
 
     async def add_audit(self, character_id: str | None, actor_id: int | str | None, kind: str, details: dict[str, Any]) -> None:
-        await asyncio.to_thread(self._insert_audit_sync, character_id, actor_id, kind, details)
+        self._queue_audit(character_id, actor_id, kind, details)
 
-    def _insert_audit_sync(self, character_id: str | None, actor_id: int | str | None, kind: str, details: dict[str, Any]) -> None:
-        self.audit.insert_one({
+    def _queue_audit(self, character_id: str | None, actor_id: int | str | None, kind: str, details: dict[str, Any]) -> None:
+        default_audit_writer().submit(self.sync_audit, {
             "character_id": character_id,
             "actor_id": str(actor_id) if actor_id is not None else None,
             "kind": kind,
@@ -484,4 +797,5 @@ def build_character_doc(fields: dict[str, str], *, player_user: Any, created_by:
         ],
     }
     doc["discord"]["starter_body"] = generated_starter_body(doc)
+    doc["schema_version"] = SCHEMA_VERSION
     return doc
@@ -1,14 +1,33 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import hashlib
 import io
+import os
 import re
+import shutil
+import threading
+import time
+import zipfile
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, AsyncIterator, Iterable, Iterator
 
 from PIL import Image
 
-from cogs_cardmaker.card import CardGenerator, Defaults
+from cogs_cardmaker.card import CardGenerator, Defaults, default_output_filename, text_segment_cache, text_sprite_cache
+from cogs_cardmaker.design_watcher import DesignWatcher
+from cogs_cardmaker.render_cache import RenderCache, default_render_cache
+from cogs_cardmaker.render_scheduler import (
+    PRIORITIES,
+    PRIORITY_BULK,
+    PRIORITY_SINGLE,
+    RenderScheduler,
+    default_render_scheduler,
+)
 
 
 STATUS_TAGS = {"active": "active", "hiatus": "hiatus", "retired": "retired"}
@@ -18,6 +37,7 @@ PLAYER_STATUS_TAGS = {"looking for rp", "looking for master", "looking for serva
 ALLOWED_IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".gif"}
 MAX_FACECLAIM_BYTES = 1_000_000
 MAX_CUSTOM_BACKGROUND_BYTES = 8_000_000
+GENERATOR_CACHE_SIZE = 8
 
 
 def extract_doc_id(value: str | None) -> str | None:
@@ -135,31 +155,417 @@ def required_card_design(character: dict[str, Any], design: str | None = None) -
     return str(layout)
 
 
+_generators: OrderedDict[str, CardGenerator] = OrderedDict()
+_generators_lock = threading.Lock()
+
+
+def generator_for(layout: str) -> CardGenerator:
+    # Generators hold the loaded layout, fonts, assets and composited base
+    # canvases, so keep a few warm instead of rebuilding them per card.
+    with _generators_lock:
+        generator = _generators.get(layout)
+    # While the design watcher runs it invalidates changed state itself, so the
+    # per-call stat of every design file is only needed without it.
+    if generator is not None and (_design_watcher is not None or not generator.is_stale()):
+        with _generators_lock:
+            if layout in _generators:
+                _generators.move_to_end(layout)
+        return generator
+    generator = CardGenerator(layout)
+    generator.design_fingerprint()
+    with _generators_lock:
+        current = _generators.get(layout)
+        if current is not None and current.design_fingerprint() == generator.design_fingerprint():
+            generator = current
+        _generators[layout] = generator
+        _generators.move_to_end(layout)
+        while len(_generators) > GENERATOR_CACHE_SIZE:
+            _generators.popitem(last=False)
+    return generator
+
+
+_design_watcher: DesignWatcher | None = None
+
+
+def invalidate_design_files(paths: Iterable[Path]) -> list[Future]:
+    """
+    Drop cached render state derived from changed design or font files.
+
+    Only the affected asset, canvas, font, text sprite and text segment entries are dropped; a
+    changed config.json drops that design's generator. Whatever was dropped is
+    re-warmed at bulk priority, and the futures for that work are returned.
+    """
+    changed = {Path(path) for path in paths}
+    rewarm: list[tuple[str, str]] = []
+    if Defaults.DESIGNS_DIR in changed or Defaults.FONTS_DIR in changed:
+        # The watcher lost events, so nothing cached can be trusted.
+        with _generators_lock:
+            rewarm = [(layout, role) for layout, generator in _generators.items() for role in generator.canvas_cache]
+            _generators.clear()
+        text_sprite_cache.clear()
+        text_segment_cache.clear()
+    else:
+        text_sprite_cache.discard_fonts(changed)
+        text_segment_cache.discard_fonts(changed)
+        with _generators_lock:
+            generators = list(_generators.items())
+        for layout, generator in generators:
+            warm_roles = set(generator.canvas_cache)
+            dropped = generator.invalidate(changed)
+            if dropped is None:
+                with _generators_lock:
+                    if _generators.get(layout) is generator:
+                        del _generators[layout]
+                dropped = warm_roles
+            rewarm.extend((layout, role) for role in sorted(dropped))
+    scheduler = default_render_scheduler()
+    return [scheduler.submit(PRIORITY_BULK, _warm_group, layout, role) for layout, role in rewarm]
+
+
+def start_design_watcher() -> DesignWatcher:
+    global _design_watcher
+    if _design_watcher is None:
+        watcher = DesignWatcher([Defaults.DESIGNS_DIR, Defaults.FONTS_DIR], invalidate_design_files)
+        watcher.start()
+        _design_watcher = watcher
+    return _design_watcher
+
+
+def stop_design_watcher() -> None:
+    global _design_watcher
+    if _design_watcher is not None:
+        _design_watcher.stop()
+        _design_watcher = None
+
+
+@dataclass
+class RenderResult:
+    index: int
+    character: dict[str, Any]
+    fingerprint: str | None = None
+    data: io.BytesIO | None = None
+    error: Exception | None = None
+    cached: bool = False
+
+
+def _render_with_generator(
+    generator: CardGenerator,
+    character: dict[str, Any],
+    runtime_images: dict[str, Image.Image] | None = None,
+    cache: RenderCache | None = None,
+    use_cache: bool = True,
+) -> tuple[io.BytesIO, str | None, bool]:
+    # One-off runtime images (custom backgrounds) are never cached.
+    fingerprint = None if runtime_images else generator.render_fingerprint(character)
+    cache = cache or default_render_cache()
+    if fingerprint and use_cache:
+        cached = cache.get(fingerprint)
+        if cached is not None:
+            return io.BytesIO(cached), fingerprint, True
+
+    buf = io.BytesIO()
+    animated = generator.render_animated(character, runtime_images=runtime_images)
+    if animated is not None:
+        buf.write(animated)
+    else:
+        generator.render(character, runtime_images=runtime_images).save(buf, "PNG")
+    if fingerprint:
+        name_hint = Path(default_output_filename(character, "card")).stem
+        avatar = Path(str(character.get("avatar_path") or "")).name or None
+        cache.put(fingerprint, buf.getvalue(), name_hint=name_hint, avatar=avatar)
+    buf.seek(0)
+    return buf, fingerprint, False
+
+
 def render_card_bytes(
     character: dict[str, Any],
     design: str | None = None,
     runtime_images: dict[str, Image.Image] | None = None,
 ) -> io.BytesIO:
     layout = required_card_design(character, design)
-    image = CardGenerator(layout).render(character, runtime_images=runtime_images)
-    buf = io.BytesIO()
-    image.save(buf, "PNG")
-    buf.seek(0)
-    return buf
+    data, _, _ = _render_with_generator(generator_for(layout), character, runtime_images)
+    return data
+
+
+def render_fingerprint(character: dict[str, Any], design: str | None = None) -> str:
+    layout = required_card_design(character, design)
+    return generator_for(layout).render_fingerprint(character)
+
+
+def _render_bytes(
+    character: dict[str, Any],
+    design: str | None,
+    runtime_images: dict[str, Image.Image] | None,
+) -> bytes:
+    return render_card_bytes(character, design, runtime_images).getvalue()
+
+
+class _Flight:
+    def __init__(self, key: str | None, fingerprint: str | None, future: Future, priority: str):
+        self.key = key
+        self.fingerprint = fingerprint
+        self.future = future
+        self.priority = priority
+        self.superseded_by: _Flight | None = None
+
+    def queued_below(self, priority: str) -> bool:
+        future = self.future
+        started = future.running() or future.done()
+        return not started and PRIORITIES.index(priority) < PRIORITIES.index(self.priority)
+
+
+# In-flight renders by fingerprint, and the newest in-flight render per character.
+_flights: dict[str, _Flight] = {}
+_character_flights: dict[str, _Flight] = {}
+_flights_lock = threading.Lock()
+
+
+def _land_flight(flight: _Flight) -> None:
+    with _flights_lock:
+        if flight.fingerprint and _flights.get(flight.fingerprint) is flight:
+            del _flights[flight.fingerprint]
+        if flight.key and _character_flights.get(flight.key) is flight:
+            del _character_flights[flight.key]
+
+
+def _join_flight(
+    character: dict[str, Any],
+    fingerprint: str | None,
+    design: str | None,
+    runtime_images: dict[str, Image.Image] | None,
+    priority: str,
+) -> _Flight:
+    # Only fingerprinted renders supersede each other. A render with runtime
+    # images (a one-off custom background) draws a different card than a plain
+    # refresh of the same character, so neither may hand its bytes to the other.
+    key = str(character["_id"]) if fingerprint and not runtime_images and character.get("_id") is not None else None
+    stale = []
+    submitted = None
+    with _flights_lock:
+        flight = _flights.get(fingerprint) if fingerprint else None
+        promoted = None
+        if flight is not None and flight.superseded_by is None and flight.queued_below(priority):
+            # Still waiting in a lower class, e.g. a speculative pre-render; queue
+            # it again at this caller's priority rather than waiting behind bulk work.
+            promoted, flight = flight, None
+        if flight is None or flight.superseded_by is not None:
+            future = default_render_scheduler().submit(priority, _render_bytes, character, design, runtime_images)
+            flight = _Flight(key, fingerprint, future, priority)
+            if fingerprint:
+                _flights[fingerprint] = flight
+            submitted = flight
+        if promoted is not None:
+            promoted.superseded_by = flight
+            stale.append(promoted)
+        previous = _character_flights.get(key) if key else None
+        if key and previous is not flight:
+            if previous is not None and previous is not promoted:
+                previous.superseded_by = flight
+                stale.append(previous)
+            _character_flights[key] = flight
+    # Both run done callbacks, which take the lock, so they happen outside it: a
+    # render that already finished runs its callback inside add_done_callback.
+    if submitted is not None:
+        submitted.future.add_done_callback(lambda _, flight=submitted: _land_flight(flight))
+    for old in stale:
+        # Only drops the stale render if it has not started yet.
+        old.future.cancel()
+    return flight
 
 
 async def render_card_bytes_async(
     character: dict[str, Any],
     design: str | None = None,
     runtime_images: dict[str, Image.Image] | None = None,
+    priority: str = PRIORITY_SINGLE,
 ) -> io.BytesIO:
-    return await asyncio.to_thread(render_card_bytes, character, design, runtime_images)
+    """
+    Render a card on the shared scheduler, coalescing concurrent requests.
+
+    Callers asking for the same fingerprint share one in-flight render. A newer
+    fingerprinted request for the same character supersedes older in-flight
+    fingerprinted work, and callers
+    still waiting on the older render receive the newer card instead, so a slow
+    stale render can never overwrite a fresh one.
+    """
+    fingerprint = None
+    if not runtime_images:
+        fingerprint = await asyncio.to_thread(render_fingerprint, character, design)
+    flight = _join_flight(character, fingerprint, design, runtime_images, priority)
+    while True:
+        try:
+            # Shielded so one cancelled caller does not cancel a render others are waiting on.
+            data = await asyncio.shield(asyncio.wrap_future(flight.future))
+        except (asyncio.CancelledError, Exception):
+            future = flight.future
+            failed = future.done() and (future.cancelled() or future.exception() is not None)
+            if flight.superseded_by is None or not failed:
+                raise
+        if flight.superseded_by is None:
+            return io.BytesIO(data)
+        flight = flight.superseded_by
+
+
+async def prerender_card_async(character: dict[str, Any], design: str | None = None) -> Future | None:
+    """
+    Speculatively render a card at bulk priority after its data changed.
+
+    Does nothing when the render cache already holds the card, so changes to
+    fields the card does not draw cost only a fingerprint. The render joins the
+    in-flight coalescing above: a later view of the card joins it, promoting it
+    to the viewer's priority if it has not started yet, and finds the bytes in
+    the render cache once it has finished.
+    """
+    fingerprint = await asyncio.to_thread(render_fingerprint, character, design)
+    if default_render_cache().path_for(fingerprint) is not None:
+        return None
+    return _join_flight(character, fingerprint, design, None, PRIORITY_BULK).future
+
+
+def _warm_group(layout: str, template_role: str) -> CardGenerator:
+    generator = generator_for(layout)
+    generator.warm(template_role)
+    return generator
+
+
+def render_many(
+    characters: Iterable[dict[str, Any]],
+    design: str | None = None,
+    *,
+    cache: RenderCache | None = None,
+    use_cache: bool = True,
+    priority: str = PRIORITY_BULK,
+    scheduler: RenderScheduler | None = None,
+    window: int | None = None,
+) -> Iterator[RenderResult]:
+    """
+    Render many cards, yielding one RenderResult per input in input order.
+
+    Inputs are consumed lazily, so `characters` may be a database cursor. Each
+    (design, template role) group's generator and base canvas are built once,
+    queued when the group is first seen; cards are rendered on the shared render
+    scheduler at `priority`. At most `window` renders run ahead of the consumer,
+    so memory stays constant however many characters there are. Failures are
+    reported on the result instead of stopping the batch.
+    """
+    scheduler = scheduler or default_render_scheduler()
+    window = window or scheduler.workers * 2
+    warmups: dict[tuple[str, str], Future] = {}
+
+    def _render(index: int, character: dict[str, Any], layout: str | Exception) -> RenderResult:
+        result = RenderResult(index=index, character=character)
+        try:
+            if isinstance(layout, Exception):
+                raise layout
+            generator = warmups[(layout, template_role_for(character))].result()
+            result.data, result.fingerprint, result.cached = _render_with_generator(
+                generator,
+                character,
+                cache=cache,
+                use_cache=use_cache,
+            )
+        except Exception as exc:
+            result.error = exc
+        return result
+
+    pending = deque()
+    try:
+        for index, character in enumerate(characters):
+            try:
+                layout = required_card_design(character, design)
+            except ValueError as exc:
+                layout = exc
+            else:
+                key = (layout, template_role_for(character))
+                if key not in warmups:
+                    # Queued ahead of the group's renders, so a render never waits on
+                    # a warm-up still queued behind it.
+                    warmups[key] = scheduler.submit(priority, _warm_group, *key)
+            pending.append(scheduler.submit(priority, _render, index, character, layout))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+async def render_many_async(
+    characters: Iterable[dict[str, Any]],
+    design: str | None = None,
+    **kwargs: Any,
+) -> AsyncIterator[RenderResult]:
+    iterator = render_many(characters, design, **kwargs)
+    done = object()
+    try:
+        while True:
+            result = await asyncio.to_thread(next, iterator, done)
+            if result is done:
+                break
+            yield result
+    finally:
+        # A cancelled caller may leave `next` still running in its thread.
+        with contextlib.suppress(ValueError):
+            await asyncio.to_thread(iterator.close)
+
+
+def _unique_entry_name(name: str, used: set[str]) -> str:
+    stem, suffix = os.path.splitext(name)
+    candidate, counter = name, 2
+    while candidate in used:
+        candidate = f"{stem}_{counter}{suffix}"
+        counter += 1
+    used.add(candidate)
+    return candidate
+
+
+def export_path(label: str) -> Path:
+    return Defaults.EXPORTS_DIR / f"cards_{safe_name_for(label)}_{time.strftime('%Y%m%d_%H%M%S')}.zip"
+
+
+def write_cards_zip(
+    characters: Iterable[dict[str, Any]],
+    path: Path,
+    design: str | None = None,
+) -> tuple[int, list[str]]:
+    """
+    Render characters straight into a ZIP archive at `path`.
+
+    Cards come from `render_many` and are copied into the archive as they finish,
+    so only the render window is held in memory. PNGs are already compressed, so
+    entries are stored rather than deflated again. The archive is written beside
+    `path` and renamed into place once complete. Returns the number of cards
+    written and a description of each failure.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    written = 0
+    failures: list[str] = []
+    used_names: set[str] = set()
+    try:
+        with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_STORED) as archive:
+            for result in render_many(characters, design):
+                character = result.character
+                if result.error:
+                    failures.append(f"{character.get('name') or character.get('_id')}: {result.error}")
+                    continue
+                info = zipfile.ZipInfo(_unique_entry_name(image_filename(character), used_names), time.localtime()[:6])
+                info.file_size = result.data.getbuffer().nbytes
+                with archive.open(info, "w") as entry:
+                    shutil.copyfileobj(result.data, entry)
+                written += 1
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return written, failures
 
 
 def design_supports_custom_background(character: dict[str, Any], design: str | None = None) -> bool:
     layout = required_card_design(character, design)
     role = template_role_for(character)
-    return CardGenerator(layout).supports_runtime_image("background", role)
+    return generator_for(layout).supports_runtime_image("background", role)
 
 
 async def design_supports_custom_background_async(character: dict[str, Any], design: str | None = None) -> bool:
@@ -180,8 +586,35 @@ def faceclaim_filename(character: dict[str, Any], extension: str) -> str:
     return f"{safe}_{doc_id}{extension.lower()}"
 
 
+def faceclaim_path(character: dict[str, Any]) -> Path | None:
+    avatar_path = str(character.get("avatar_path") or "").strip()
+    if not avatar_path:
+        return None
+    path = Path(avatar_path)
+    if not path.is_absolute():
+        path = Defaults.FACECLAIMS_DIR / path
+    if not path.exists() or not path.is_file():
+        return None
+    return path
+
+
+def faceclaim_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+async def faceclaim_hash_async(path: Path) -> str:
+    return await asyncio.to_thread(faceclaim_hash, path)
+
+
 def _save_image_under_limit(img: Image.Image, path: Path, fmt: str) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
+    if getattr(img, "is_animated", False) and fmt != "JPEG":
+        # Animated faceclaims keep every frame; the resize fallbacks below would flatten them.
+        img.save(path, fmt, save_all=True)
+        if path.stat().st_size > MAX_FACECLAIM_BYTES:
+            raise ValueError("Animated faceclaims must be 1 MB or smaller.")
+        return
+
     if fmt == "PNG":
         working = img
         for _ in range(5):
@@ -11,14 +11,18 @@ Responsibilities:
     - max_sections_to_post: cap to avoid diff spam
 
 Implementation notes:
-- Uses synchronous PyMongo under the hood.
-- Wraps all DB work in asyncio.to_thread to avoid blocking Discord’s event loop.
+- Uses PyMongo's native asyncio API (AsyncMongoClient), so DB work is
+  awaited on Discord’s event loop without a worker thread.
+- Reads go through the shared services.guild_config cache, so per-message
+  lookups normally cost no DB calls. Every setter invalidates the guild.
+- Defaults are filled in on read and never written back; setters upsert.
 """
 
 from __future__ import annotations
-import asyncio
 from typing import Any, Dict, List, Optional
 
+from services.guild_config import default_guild_config_cache
+
 DEFAULTS = {
     "check_interval_minutes": 360,   # 6 hours
     "history_scan_limit": 500,       # number of messages read per tracked channel
@@ -31,66 +35,52 @@ DEFAULTS = {
 
 class GuildConfigRepo:
     """
-    Uses synchronous PyMongo under the hood, wrapped with asyncio.to_thread.
+    Native async PyMongo; `db` is an AsyncMongoClient database.
     """
     def __init__(self, db):
         self.col = db["guild_config"]
 
     async def get(self, guild_id: int) -> Dict[str, Any]:
-        def _get():
-            cfg = self.col.find_one({"guild_id": str(guild_id)})
-            if not cfg:
-                cfg = {
-                    "guild_id": str(guild_id),
-                    "tracked_channel_ids": [],
-                    "mod_alert_channel_id": None,
-                    **DEFAULTS
-                }
-                self.col.insert_one(cfg)
-            # backfill defaults
-            patch = {}
-            for k, v in DEFAULTS.items():
-                if k not in cfg:
-                    cfg[k] = v
-                    patch[k] = v
-            if patch:
-                self.col.update_one({"guild_id": str(guild_id)}, {"$set": patch}, upsert=True)
-            return cfg
-
-        return await asyncio.to_thread(_get)
+        cfg = await default_guild_config_cache().get(self.col, guild_id)
+        if not cfg:
+            cfg = {
+                "guild_id": str(guild_id),
+                "tracked_channel_ids": [],
+                "mod_alert_channel_id": None,
+            }
+        # backfill defaults
+        for k, v in DEFAULTS.items():
+            cfg.setdefault(k, v)
+        return cfg
 
     async def set_mod_channel(self, guild_id: int, channel_id: int) -> None:
-        def _set():
-            self.col.update_one(
-                {"guild_id": str(guild_id)},
-                {"$set": {"mod_alert_channel_id": str(channel_id)}},
-                upsert=True
-            )
-        await asyncio.to_thread(_set)
+        await self.col.update_one(
+            {"guild_id": str(guild_id)},
+            {"$set": {"mod_alert_channel_id": str(channel_id)}},
+            upsert=True
+        )
+        default_guild_config_cache().invalidate(self.col, guild_id)
 
     async def set_tracked_channels(self, guild_id: int, channel_ids: List[int]) -> None:
-        def _set():
-            self.col.update_one(
-                {"guild_id": str(guild_id)},
-                {"$set": {"tracked_channel_ids": [str(x) for x in channel_ids]}},
-                upsert=True
-            )
-        await asyncio.to_thread(_set)
+        await self.col.update_one(
+            {"guild_id": str(guild_id)},
+            {"$set": {"tracked_channel_ids": [str(x) for x in channel_ids]}},
+            upsert=True
+        )
+        default_guild_config_cache().invalidate(self.col, guild_id)
 
     async def set_mod_roles(self, guild_id: int, role_ids: List[int]) -> None:
-        def _set():
-            self.col.update_one(
-                {"guild_id": str(guild_id)},
-                {"$set": {"mod_role_ids": [str(x) for x in role_ids]}},
-                upsert=True
-            )
-        await asyncio.to_thread(_set)
+        await self.col.update_one(
+            {"guild_id": str(guild_id)},
+            {"$set": {"mod_role_ids": [str(x) for x in role_ids]}},
+            upsert=True
+        )
+        default_guild_config_cache().invalidate(self.col, guild_id)
 
     async def set_submission_channel(self, guild_id: int, channel_id: int) -> None:
-        def _set():
-            self.col.update_one(
-                {"guild_id": str(guild_id)},
-                {"$set": {"submission_channel_id": str(channel_id)}},
-                upsert=True
-            )
-        await asyncio.to_thread(_set)
+        await self.col.update_one(
+            {"guild_id": str(guild_id)},
+            {"$set": {"submission_channel_id": str(channel_id)}},
+            upsert=True
+        )
+        default_guild_config_cache().invalidate(self.col, guild_id)
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any
+
+from pymongo.errors import BulkWriteError
+
+
+AUDIT_QUEUE_SIZE = 10_000
+AUDIT_BATCH_SIZE = 200
+AUDIT_FLUSH_SECONDS = 1.0
+AUDIT_BLOCK_SECONDS = 0.5
+CLOSE_TIMEOUT_SECONDS = 10.0
+FLUSH_SAMPLES = 256
+
+POLICY_DROP = "drop"
+POLICY_BLOCK = "block"
+
+_STOP = object()
+
+
+class AuditWriter:
+    """
+    Background writer that batches audit entries into insert_many calls.
+
+    Entries are queued with `submit` and written by one daemon thread, grouped
+    per collection, once `batch_size` entries are pending or the oldest has
+    waited `flush_seconds`. Batches are unordered, so one bad entry does not stop
+    the rest. When the queue is full, the `drop` policy discards the new entry
+    and the `block` policy waits up to `block_seconds` for room first. `submit`
+    is called from the event loop, so the default policy never blocks it.
+    """
+
+    def __init__(
+        self,
+        max_queue: int = AUDIT_QUEUE_SIZE,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_seconds: float = AUDIT_FLUSH_SECONDS,
+        policy: str = POLICY_DROP,
+        block_seconds: float = AUDIT_BLOCK_SECONDS,
+    ):
+        if policy not in (POLICY_DROP, POLICY_BLOCK):
+            raise ValueError(f"Unknown audit queue policy '{policy}'. Expected '{POLICY_DROP}' or '{POLICY_BLOCK}'.")
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.policy = policy
+        self.block_seconds = block_seconds
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        self._deadline = 0.0
+        self._flushes: deque[float] = deque(maxlen=FLUSH_SAMPLES)
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    def _start_locked(self) -> None:
+        # Also replaces a writer thread that died, so entries never sit unwritten.
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def submit(self, collection, entry: dict[str, Any]) -> bool:
+        """Queue one entry for `collection`. Returns False when it was dropped."""
+        with self._lock:
+            if self._closed:
+                self.dropped += 1
+                return False
+            self._start_locked()
+        try:
+            if self.policy == POLICY_BLOCK:
+                self._queue.put((collection, entry), timeout=self.block_seconds)
+            else:
+                self._queue.put_nowait((collection, entry))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Write everything queued so far. Returns False if that took longer than `timeout`."""
+        with self._lock:
+            running = self._thread is not None and self._thread.is_alive()
+            if not running and (self._closed or self._queue.empty()):
+                return self._queue.empty()
+            self._start_locked()
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: float = CLOSE_TIMEOUT_SECONDS) -> None:
+        """Flush queued entries and stop the writer thread. Later entries are dropped."""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        if thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            print(f"Audit writer did not stop; {self._queue.qsize()} entries were not written.")
+            return
+        thread.join(timeout)
+
+    def _write(self, pending: dict[str, tuple[Any, list[dict[str, Any]]]]) -> None:
+        for collection, entries in pending.values():
+            started = time.monotonic()
+            try:
+                result = collection.insert_many(entries, ordered=False)
+                written = len(result.inserted_ids)
+            except BulkWriteError as exc:
+                # An unordered batch still inserts the entries that did not fail.
+                written = exc.details.get("nInserted", 0)
+                print(f"Audit write to {collection.name} failed for {len(entries) - written} of {len(entries)} entries: {exc}")
+            except Exception as exc:
+                written = 0
+                print(f"Audit write to {collection.name} failed for {len(entries)} entries: {exc}")
+            with self._lock:
+                self._flushes.append(time.monotonic() - started)
+                self.batches += 1
+                self.written += written
+                self.failed += len(entries) - written
+        pending.clear()
+
+    def _run(self) -> None:
+        pending: dict[str, tuple[Any, list[dict[str, Any]]]] = {}
+        while True:
+            try:
+                if self._step(pending):
+                    return
+            except Exception as exc:
+                # One bad batch must not stop the writer; its entries count as failed.
+                lost = sum(len(entries) for _, entries in pending.values())
+                pending.clear()
+                with self._lock:
+                    self.failed += lost
+                print(f"Audit writer error; {lost} entries were not written: {exc}")
+
+    def _step(self, pending: dict[str, tuple[Any, list[dict[str, Any]]]]) -> bool:
+        """Handle one queue item, or a flush deadline. Returns True once stopped."""
+        try:
+            item = self._queue.get(timeout=max(0.0, self._deadline - time.monotonic()) if pending else None)
+        except queue.Empty:
+            self._write(pending)
+            return False
+        if item is _STOP or isinstance(item, threading.Event):
+            self._write(pending)
+            if item is _STOP:
+                return True
+            item.set()
+            return False
+
+        collection, entry = item
+        if not pending:
+            self._deadline = time.monotonic() + self.flush_seconds
+        pending.setdefault(collection.full_name, (collection, []))[1].append(entry)
+        if sum(len(entries) for _, entries in pending.values()) >= self.batch_size:
+            self._write(pending)
+        return False
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            flushes = self._flushes
+            return {
+                "queued": self._queue.qsize(),
+                "policy": self.policy,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "batches": self.batches,
+                "flush_avg_ms": sum(flushes) / len(flushes) * 1000 if flushes else 0.0,
+                "flush_max_ms": max(flushes) * 1000 if flushes else 0.0,
+            }
+
+
+_default_writer: AuditWriter | None = None
+_default_writer_lock = threading.Lock()
+
+
+def default_audit_writer() -> AuditWriter:
+    global _default_writer
+    with _default_writer_lock:
+        if _default_writer is None:
+            _default_writer = AuditWriter()
+        return _default_writer
+
+
+def close_default_audit_writer(timeout: float = CLOSE_TIMEOUT_SECONDS) -> None:
+    """Flush and stop the shared writer, if one was started; used on bot shutdown."""
+    with _default_writer_lock:
+        writer = _default_writer
+    if writer is not None:
+        writer.close(timeout)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from typing import Any
+
+
+# Every bot write invalidates its guild, so this only bounds how long a manual
+# edit in MongoDB takes to be picked up.
+GUILD_CONFIG_TTL_SECONDS = 60.0
+
+_MISS = object()
+
+
+class GuildConfigCache:
+    """
+    Process-wide TTL cache of guild_config documents, read through an
+    AsyncMongoClient collection.
+
+    Shared by the cardmaker and sheetwatch repos, which read the same documents
+    on nearly every event. Guilds without a document are cached as None, so they
+    cost no reads either. Every `set_*` method calls `invalidate` after writing.
+    A read that was in flight during an invalidation is not cached, so it
+    cannot put back the old document.
+    """
+
+    def __init__(self, ttl_seconds: float = GUILD_CONFIG_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[tuple[str, str], tuple[float, dict[str, Any] | None]] = {}
+        self._generations: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(collection, guild_id: int | str) -> tuple[str, str]:
+        return collection.full_name, str(guild_id)
+
+    def _cached(self, key: tuple[str, str]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] >= self.ttl_seconds:
+                self.misses += 1
+                return _MISS
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    async def _fetch(self, collection, guild_id: int | str) -> dict[str, Any] | None:
+        key = self._key(collection, guild_id)
+        with self._lock:
+            generation = self._generations.get(key, 0)
+        doc = await collection.find_one({"guild_id": str(guild_id)})
+        with self._lock:
+            if self._generations.get(key, 0) == generation:
+                self._entries[key] = (time.monotonic(), copy.deepcopy(doc))
+        return doc
+
+    async def get(self, collection, guild_id: int | str) -> dict[str, Any] | None:
+        """The guild's document, or None when it has no settings."""
+        cached = self._cached(self._key(collection, guild_id))
+        return await self._fetch(collection, guild_id) if cached is _MISS else cached
+
+    def invalidate(self, collection, guild_id: int | str) -> None:
+        key = self._key(collection, guild_id)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "guilds": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_default_cache: GuildConfigCache | None = None
+_default_cache_lock = threading.Lock()
+
+
+def default_guild_config_cache() -> GuildConfigCache:
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = GuildConfigCache()
+        return _default_cache
@@ -1,8 +1,109 @@
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient, MongoClient, monitoring
 import os
+import threading
+from collections import deque
 from dotenv import load_dotenv
 
-def get_database(dbname='grail-kun'):
+# Pool settings read from the environment when a client is first created. Unset
+# variables keep PyMongo's defaults (or whatever the connection string sets).
+POOL_OPTIONS = {
+    "maxPoolSize": "MONGODB_MAX_POOL_SIZE",
+    "minPoolSize": "MONGODB_MIN_POOL_SIZE",
+    "maxIdleTimeMS": "MONGODB_MAX_IDLE_TIME_MS",
+    "waitQueueTimeoutMS": "MONGODB_WAIT_QUEUE_TIMEOUT_MS",
+    "connectTimeoutMS": "MONGODB_CONNECT_TIMEOUT_MS",
+    "socketTimeoutMS": "MONGODB_SOCKET_TIMEOUT_MS",
+    "serverSelectionTimeoutMS": "MONGODB_SERVER_SELECTION_TIMEOUT_MS",
+}
+WAIT_SAMPLES = 1024
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Connection pool listener that tracks checkout wait times and connections in
+    use, summed over every pool of the clients it is registered with.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+        self.open = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.pools_cleared = 0
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pools_cleared += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open -= 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+            if event.duration is not None:
+                self._waits.append(event.duration)
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            if event.duration is not None:
+                self._waits.append(event.duration)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use -= 1
+
+    def stats(self):
+        with self._lock:
+            waits = sorted(self._waits)
+            return {
+                "open": self.open,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "pools_cleared": self.pools_cleared,
+                "wait_avg_ms": sum(waits) / len(waits) * 1000 if waits else 0.0,
+                "wait_p95_ms": waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000 if waits else 0.0,
+                "wait_max_ms": waits[-1] * 1000 if waits else 0.0,
+            }
+
+
+sync_pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+_clients = {}
+_async_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _connection_string():
     # Load environment variables
     load_dotenv()
 
@@ -10,7 +111,58 @@ def get_database(dbname='grail-kun'):
     connection_string = os.getenv("MONGODB_URI")
     if not connection_string:
         raise ValueError("MongoDB URI not found in .env file")
-    
-    # Create and return database connection
-    client = MongoClient(connection_string)
-    return client[dbname]
\ No newline at end of file
+    return connection_string
+
+def pool_options():
+    load_dotenv()
+    options = {}
+    for option, variable in POOL_OPTIONS.items():
+        value = os.getenv(variable)
+        if value:
+            options[option] = int(value)
+    return options
+
+def get_client(uri=None):
+    # One MongoClient per connection string for the whole process; databases
+    # share its connection pool.
+    uri = uri or _connection_string()
+    with _clients_lock:
+        client = _clients.get(uri)
+        if client is None:
+            client = _clients[uri] = MongoClient(uri, event_listeners=[sync_pool_metrics], **pool_options())
+        return client
+
+def get_async_client(uri=None):
+    # Same as get_client for AsyncMongoClient. It binds to the event loop that
+    # first uses it, so close it with close_async_clients before that loop ends.
+    uri = uri or _connection_string()
+    with _clients_lock:
+        client = _async_clients.get(uri)
+        if client is None:
+            client = _async_clients[uri] = AsyncMongoClient(uri, event_listeners=[async_pool_metrics], **pool_options())
+        return client
+
+def get_database(dbname='grail-kun', uri=None):
+    return get_client(uri)[dbname]
+
+def get_async_database(dbname='grail-kun', uri=None):
+    # Native asyncio handle for code running on the event loop; awaiting it
+    # needs no worker thread, unlike pymongo calls wrapped in asyncio.to_thread.
+    return get_async_client(uri)[dbname]
+
+def close_clients():
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+async def close_async_clients():
+    with _clients_lock:
+        clients = list(_async_clients.values())
+        _async_clients.clear()
+    for client in clients:
+        await client.close()
+
+def pool_stats():
+    return {"sync": sync_pool_metrics.stats(), "async": async_pool_metrics.stats()}